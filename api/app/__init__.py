@@ -1,51 +1,26 @@
-from pathlib import Path
+"""Drone-as-a-Service API.
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+Importing the package is cheap: FastAPI, the routers and the database are
+only loaded when ``create_app`` is called or ``app`` is first accessed.
+Building the app touches no database either; migrations and demo seeding
+run in its lifespan hook when a server (or ``TestClient``) starts it.
+"""
 
-from .config import get_settings
-from .db import init_db, seed_demo_data
-from .routers import auth, drones, bookings, owners, assets
+from typing import Any
 
 
-def create_app() -> FastAPI:
-    settings = get_settings()
-    init_db()
-    seed_demo_data()
+def __getattr__(name: str) -> Any:
+    if name == "create_app":
+        from .application import create_app
 
-    app = FastAPI(
-        title="Drone-as-a-Service API",
-        version="1.0.0",
-        summary="OTP-based API for drone discovery and bookings",
-    )
+        return create_app
+    if name == "app":
+        # Built once on first access, never at import time, so worker
+        # processes (which call ``create_app`` through the import-string
+        # factory) don't construct a second instance.
+        global app
+        from .application import create_app
 
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=["*"],
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"]
-    )
-
-    @app.get("/")
-    def root() -> dict[str, object]:
-        return {"status": "ok", "otp_demo": settings.otp_code, "jwt": True}
-
-    static_root = Path(settings.static_root)
-    uploads_root = Path(settings.upload_dir)
-    static_root.mkdir(parents=True, exist_ok=True)
-    uploads_root.mkdir(parents=True, exist_ok=True)
-
-    app.mount("/static", StaticFiles(directory=str(static_root)), name="static")
-
-    app.include_router(auth.router, prefix="/auth", tags=["auth"])
-    app.include_router(drones.router, prefix="/drones", tags=["drones"])
-    app.include_router(bookings.router, prefix="/bookings", tags=["bookings"])
-    app.include_router(owners.router, prefix="/owners", tags=["owners"])
-    app.include_router(assets.router, prefix="/assets", tags=["assets"])
-
-    return app
-
-
-app = create_app()
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import signal
+import threading
+from contextlib import asynccontextmanager
+from pathlib import Path
+from types import FrameType
+from typing import AsyncIterator, Callable
+
+from anyio import to_thread
+from fastapi import FastAPI, Response
+from fastapi.middleware.cors import CORSMiddleware
+
+from .config import get_settings
+from .db import close_pool, current_writer, executor_queue_depth, prepare_database
+from .events import EventHub, get_hub
+from .metrics import CONTENT_TYPE, MetricsMiddleware, MetricsRegistry
+from .pagination import NEXT_CURSOR_HEADER
+from .routers import auth, drones, bookings, owners, assets, events
+from .static import AssetFiles
+from .tracing import QUERIES_HEADER, TIME_HEADER, QueryStatsMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    # Database work runs on its own threads (see db.run_db); this limiter
+    # only covers what is still synchronous, such as file uploads and exports.
+    to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+    await to_thread.run_sync(prepare_database, settings.seed_demo)
+    await get_hub().start()
+    _close_events_on_exit_signal(get_hub())
+    try:
+        yield
+    finally:
+        get_hub().close()
+        # A later app in this process (tests, the selftest) starts with a fresh hub.
+        get_hub.cache_clear()
+        close_pool()
+
+
+def _close_events_on_exit_signal(hub: EventHub) -> None:
+    """End event streams as soon as the server is told to stop.
+
+    Uvicorn waits for in-flight responses, open SSE streams included, before
+    running the lifespan shutdown, so closing the hub only there would hold
+    every stop up for the graceful timeout. The server's own handler still
+    runs after ours.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        # Signal handlers belong to the main thread (not the case under TestClient).
+        return
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(signum)
+        if not callable(previous):
+            continue
+
+        def handler(received: int, frame: FrameType | None, previous: Callable = previous) -> None:
+            loop.call_soon_threadsafe(hub.close)
+            previous(received, frame)
+
+        signal.signal(signum, handler)
+
+
+def create_app() -> FastAPI:
+    settings = get_settings()
+
+    app = FastAPI(
+        title="Drone-as-a-Service API",
+        version="1.0.0",
+        summary="OTP-based API for drone discovery and bookings",
+        lifespan=lifespan,
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag", QUERIES_HEADER, TIME_HEADER],
+    )
+    if settings.db_trace:
+        app.add_middleware(QueryStatsMiddleware, headers=settings.db_debug_headers)
+
+    if settings.metrics_enabled:
+        # Added last so it is outermost: latency includes CORS and error handling.
+        registry = MetricsRegistry()
+        app.add_middleware(MetricsMiddleware, registry=registry)
+
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics() -> Response:
+            limiter = to_thread.current_default_thread_limiter()
+            gauges = (
+                ("db_executor_queue_depth", "Database calls waiting for a database thread.", executor_queue_depth()),
+                ("threadpool_busy", "Worker threads in use for blocking handler work.", limiter.borrowed_tokens),
+                ("threadpool_waiting", "Tasks queued for a worker thread.", limiter.statistics().tasks_waiting),
+            )
+            hub = get_hub()
+            gauges += (
+                ("events_subscribers", "Open SSE and WebSocket event streams.", hub.subscribers),
+                ("events_published_total", "Events published to the hub.", hub.published),
+                ("events_dropped_subscribers_total", "Streams cut off for falling behind.", hub.dropped),
+            )
+            writer = current_writer()
+            if writer is not None:
+                # writes_total / batches_total is the mean commit group size.
+                gauges += (
+                    ("db_write_queue_depth", "Writes waiting for the writer thread.", writer.queue_depth()),
+                    ("db_write_batches_total", "Transactions committed by the writer.", writer.batches),
+                    ("db_writes_total", "Writes run by the writer.", writer.writes),
+                    ("db_write_last_batch_size", "Writes in the most recent commit group.", writer.last_batch_size),
+                    ("db_write_commit_seconds_total", "Time spent in COMMIT by the writer.", writer.commit_seconds),
+                )
+            return Response(registry.render(gauges), media_type=CONTENT_TYPE)
+
+    @app.get("/")
+    async def root() -> dict[str, object]:
+        return {"status": "ok", "otp_demo": settings.otp_code, "jwt": True}
+
+    static_root = Path(settings.static_root)
+    uploads_root = Path(settings.upload_dir)
+    static_root.mkdir(parents=True, exist_ok=True)
+    uploads_root.mkdir(parents=True, exist_ok=True)
+
+    app.mount("/static", AssetFiles(directory=str(static_root)), name="static")
+
+    app.include_router(auth.router, prefix="/auth", tags=["auth"])
+    app.include_router(drones.router, prefix="/drones", tags=["drones"])
+    app.include_router(bookings.router, prefix="/bookings", tags=["bookings"])
+    app.include_router(owners.router, prefix="/owners", tags=["owners"])
+    app.include_router(assets.router, prefix="/assets", tags=["assets"])
+    app.include_router(events.router, prefix="/events", tags=["events"])
+
+    return app
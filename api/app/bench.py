@@ -0,0 +1,339 @@
+"""Micro-benchmarks for the request hot path.
+
+Each case is timed the way ``timeit`` does it: the loop count is calibrated
+so one sample takes at least ``MIN_SAMPLE_SECONDS``, then ``repeat`` samples
+are taken and reported per call. A case fails when its median exceeds the
+stored threshold in ``bench_thresholds.json``.
+
+Handlers are awaited directly, bypassing HTTP, on synthetic databases that
+grow through ``SIZES``. The benchmark truncates the configured database like
+the selftest does, so ``main.py --bench`` points ``DB_PATH`` at a throwaway
+file.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import sqlite3
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from starlette.requests import Request
+
+from .cache import get_catalog
+from .db import get_pool, init_db, truncate_tables
+from .identity import Identity
+from .metrics import MetricsMiddleware, MetricsRegistry
+from .migrations import assert_indexed_plans
+from .models import BookingOut, DroneOut, UserRole
+from .routers.bookings import list_bookings
+from .routers.drones import _fetch_drone_images, list_drones
+from .security import generate_token, jwt_decode, jwt_encode
+from .slots import slot_bounds
+from .tracing import TracedConnection, tracked_queries
+from .utils import haversine_km
+
+
+THRESHOLDS_PATH = Path(__file__).resolve().parent / "bench_thresholds.json"
+# Drone counts of the synthetic databases; each has five bookings per drone
+# and twenty drones per owner.
+SIZES = (100, 1_000, 10_000)
+PAGE_SIZE = 50
+MIN_SAMPLE_SECONDS = 0.02
+# --bench-update stores this multiple of the measured median.
+THRESHOLD_HEADROOM = 2.0
+ORIGIN = (25.62, 85.14)
+
+
+@dataclass
+class Timing:
+    name: str
+    loops: int
+    samples: list[float]
+
+    @property
+    def median_us(self) -> float:
+        return statistics.median(self.samples) * 1e6
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "loops": self.loops,
+            "min_us": round(min(self.samples) * 1e6, 3),
+            "median_us": round(self.median_us, 3),
+            "mean_us": round(statistics.fmean(self.samples) * 1e6, 3),
+            "stdev_us": round(statistics.stdev(self.samples) * 1e6, 3) if len(self.samples) > 1 else 0.0,
+        }
+
+
+def measure(name: str, fn: Callable[[], Any], repeat: int) -> Timing:
+    """Time a synchronous callable; samples are seconds per call."""
+
+    def sample(loops: int) -> float:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        return time.perf_counter() - start
+
+    loops = _calibrate(sample)
+    return Timing(name, loops, [sample(loops) / loops for _ in range(repeat)])
+
+
+def measure_async(loop: asyncio.AbstractEventLoop, name: str, fn: Callable[[], Awaitable[Any]], repeat: int) -> Timing:
+    """Time a coroutine function awaited back to back on ``loop``."""
+
+    async def run(loops: int) -> float:
+        start = time.perf_counter()
+        for _ in range(loops):
+            await fn()
+        return time.perf_counter() - start
+
+    def sample(loops: int) -> float:
+        return loop.run_until_complete(run(loops))
+
+    loops = _calibrate(sample)
+    return Timing(name, loops, [sample(loops) / loops for _ in range(repeat)])
+
+
+def _calibrate(sample: Callable[[int], float]) -> int:
+    loops = 1
+    while True:
+        if sample(loops) >= MIN_SAMPLE_SECONDS:
+            return loops
+        loops *= 4
+
+
+def _request(path: str, query: str = "") -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query.encode(), "headers": []})
+
+
+def _drones_page(**filters: Any) -> Callable[[], Awaitable[Any]]:
+    # Every parameter is passed: outside FastAPI the Query() defaults are not resolved.
+    params = {
+        "lat": None,
+        "lon": None,
+        "max_dist_km": None,
+        "min_price": None,
+        "max_price": None,
+        "drone_type": None,
+        "status": None,
+        "min_battery_mah": None,
+        "min_capacity_liters": None,
+        "sort_by": None,
+        "limit": PAGE_SIZE,
+        "cursor": None,
+    }
+    params.update(filters)
+    request = _request("/drones/", "&".join(f"{key}={value}" for key, value in filters.items()))
+
+    async def call() -> Any:
+        # Drop cached listings so every call takes the database path.
+        get_catalog().invalidate()
+        return await list_drones(request, **params)
+
+    return call
+
+
+def _bookings_page(identity: Identity) -> Callable[[], Awaitable[Any]]:
+    request = _request("/bookings/", f"limit={PAGE_SIZE}")
+
+    async def call() -> Any:
+        return await list_bookings(request, status=None, limit=PAGE_SIZE, cursor=None, identity=identity)
+
+    return call
+
+
+def _metrics_middleware_call(registry: MetricsRegistry) -> Callable[[], Awaitable[Any]]:
+    """One request through ``MetricsMiddleware`` around an app that only replies."""
+
+    async def endpoint(scope: Any, receive: Any, send: Any) -> None:
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Any) -> None:
+        pass
+
+    middleware = MetricsMiddleware(endpoint, registry)
+
+    def call() -> Awaitable[None]:
+        return middleware({"type": "http", "method": "GET", "path": "/drones/1"}, receive, send)
+
+    return call
+
+
+def fill_database(drones: int, start: int, rng: random.Random) -> None:
+    """Grow the synthetic data set from ``start`` drones to ``drones``."""
+    owners = range(start // 20 + 1, drones // 20 + 1)
+    drone_ids = range(start + 1, drones + 1)
+    now = datetime.utcnow()
+    with get_pool().connection() as con:
+        con.executemany(
+            "INSERT INTO owners(id,name,mobile,lat,lon) VALUES(?,?,?,?,?)",
+            [(owner, f"Owner {owner}", f"6{owner:09d}", *ORIGIN) for owner in owners],
+        )
+        con.executemany(
+            "INSERT INTO drones(id,name,type,lat,lon,status,price_per_hr,image_url,battery_mah,capacity_liters,owner_id) "
+            "VALUES(?,?,?,?,?,?,?,?,?,?,?)",
+            [
+                (
+                    drone,
+                    f"Drone {drone}",
+                    rng.choice(("Spray", "Survey", "Mapping")),
+                    ORIGIN[0] + rng.gauss(0, 0.1),
+                    ORIGIN[1] + rng.gauss(0, 0.1),
+                    "Available",
+                    float(rng.randrange(500, 15_000, 50)),
+                    f"https://example.com/drones/{drone}.jpg",
+                    8000.0,
+                    20.0,
+                    (drone - 1) // 20 + 1,
+                )
+                for drone in drone_ids
+            ],
+        )
+        con.executemany(
+            "INSERT INTO drone_images(drone_id,url) VALUES(?,?)",
+            [(drone, f"https://example.com/drones/{drone}/{index}.jpg") for drone in drone_ids for index in range(2)],
+        )
+        bookings = []
+        for drone in drone_ids:
+            for _ in range(5):
+                booked_at = now - timedelta(minutes=rng.randrange(525_600))
+                hours = rng.randint(1, 8)
+                bookings.append(
+                    (
+                        drone,
+                        "Farmer",
+                        f"8{rng.randrange(1000):09d}",
+                        booked_at.isoformat(),
+                        hours,
+                        rng.choice(("Pending", "Accepted", "Rejected")),
+                        *slot_bounds(booked_at, hours),
+                    )
+                )
+        con.executemany(
+            "INSERT INTO bookings(drone_id,farmer_name,farmer_mobile,booking_date,duration_hrs,status,starts_at,ends_at) "
+            "VALUES(?,?,?,?,?,?,?,?)",
+            bookings,
+        )
+        con.execute("ANALYZE")
+        con.commit()
+        # Fresh statistics can change the planner's choices; a hot query that
+        # falls back to a scan at this size should fail here, not just run slow.
+        assert_indexed_plans(con)
+    get_catalog().invalidate()
+
+
+def load_thresholds() -> dict[str, float]:
+    if not THRESHOLDS_PATH.exists():
+        return {}
+    return json.loads(THRESHOLDS_PATH.read_text())
+
+
+def run_bench(repeat: int = 7, update_thresholds: bool = False) -> dict[str, Any]:
+    init_db()
+    truncate_tables()
+    timings: list[Timing] = []
+
+    token = generate_token("7000000000", "owner")
+    claims = jwt_decode(token)
+    timings.append(measure("jwt_encode", lambda: jwt_encode(claims), repeat))
+    timings.append(measure("jwt_decode", lambda: jwt_decode(token), repeat))
+    timings.append(measure("haversine_km", lambda: haversine_km(25.61, 85.14, 25.70, 85.22), repeat))
+
+    drone_row = {
+        "id": 1, "name": "Drone 1", "type": "Spray", "lat": 25.61, "lon": 85.14, "status": "Available",
+        "price_per_hr": 500.0, "image_url": "https://example.com/drones/1.jpg", "battery_mah": 8000.0,
+        "capacity_liters": 20.0, "owner_id": 1,
+    }
+    booking_row = {
+        "id": 1, "drone_id": 1, "farmer_name": "Farmer", "farmer_mobile": "8000000001",
+        "booking_date": "2024-06-01T09:30:00", "duration_hrs": 2, "status": "Pending",
+    }
+    timings.append(measure("DroneOut", lambda: DroneOut(**drone_row, image_urls=[drone_row["image_url"]]), repeat))
+    timings.append(measure("BookingOut", lambda: BookingOut(**booking_row), repeat))
+    registry = MetricsRegistry()
+    timings.append(
+        measure("metrics.observe", lambda: registry.observe("GET", "/drones/{drone_id}", 200, 0.003), repeat)
+    )
+
+    # Statement tracing cost: the same lookup on a plain and a traced connection.
+    for label, factory in (("sql.plain", sqlite3.Connection), ("sql.traced", TracedConnection)):
+        memory = sqlite3.connect(":memory:", factory=factory)
+        with tracked_queries():
+            timings.append(measure(label, lambda: memory.execute("SELECT ?", (1,)).fetchone(), repeat))
+        memory.close()
+
+    rng = random.Random(42)
+    owner = Identity(mobile="6000000001", role=UserRole.owner, profile_id=1)
+    loop = asyncio.new_event_loop()
+    try:
+        timings.append(measure_async(loop, "metrics.middleware", _metrics_middleware_call(registry), repeat))
+        filled = 0
+        for size in SIZES:
+            fill_database(size, filled, rng)
+            filled = size
+            page_ids = list(range(1, min(size, PAGE_SIZE) + 1))
+
+            def fetch_images() -> Any:
+                with get_pool().connection() as con:
+                    return _fetch_drone_images(con, page_ids)
+
+            timings.append(measure(f"_fetch_drone_images@{size}", fetch_images, repeat))
+            timings.append(measure_async(loop, f"list_drones.page@{size}", _drones_page(sort_by="price"), repeat))
+            timings.append(
+                measure_async(
+                    loop,
+                    f"list_drones.radius@{size}",
+                    _drones_page(lat=ORIGIN[0], lon=ORIGIN[1], max_dist_km=10.0, sort_by="distance"),
+                    repeat,
+                )
+            )
+            timings.append(measure_async(loop, f"list_bookings.owner@{size}", _bookings_page(owner), repeat))
+    finally:
+        loop.close()
+    truncate_tables()
+
+    thresholds = load_thresholds()
+    results = []
+    regressions = []
+    for timing in timings:
+        row = timing.summary()
+        limit = thresholds.get(timing.name)
+        row["threshold_us"] = limit
+        if limit is not None and timing.median_us > limit:
+            regressions.append(timing.name)
+        results.append(row)
+
+    if update_thresholds:
+        THRESHOLDS_PATH.write_text(
+            json.dumps(
+                {timing.name: round(timing.median_us * THRESHOLD_HEADROOM, 1) for timing in timings},
+                indent=2,
+            )
+            + "\n"
+        )
+        regressions = []
+
+    return {"bench": "regressed" if regressions else "ok", "regressions": regressions, "results": results}
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lines = [f"{'case':<30} {'loops':>7} {'min us':>11} {'median us':>11} {'stdev us':>10} {'limit us':>11}"]
+    for row in report["results"]:
+        limit = row["threshold_us"]
+        flag = "  REGRESSED" if row["name"] in report["regressions"] else ""
+        lines.append(
+            f"{row['name']:<30} {row['loops']:>7} {row['min_us']:>11.2f} {row['median_us']:>11.2f} "
+            f"{row['stdev_us']:>10.2f} {limit if limit is not None else '-':>11}{flag}"
+        )
+    return "\n".join(lines)
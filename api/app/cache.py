@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Hashable
+
+from .config import get_settings
+
+
+class CatalogCache:
+    """LRU cache of drone detail and listing results.
+
+    Entries are weighted by the number of drones they hold, so ``max_rows``
+    bounds memory. Writers call :meth:`drone_changed` or :meth:`invalidate`
+    after committing; both bump ``generation`` so a reader that queried
+    before the write can never store its now-stale result.
+
+    Writes made by other worker processes are picked up by polling the shared
+    ``drones`` data version at most every ``revalidate_seconds``: readers call
+    :meth:`claim_revalidation` and, when it returns True, feed the current
+    version to :meth:`observe_version`.
+    """
+
+    def __init__(self, max_rows: int, revalidate_seconds: float = 1.0) -> None:
+        self.max_rows = max_rows
+        self.revalidate_seconds = revalidate_seconds
+        self.data_version: int | None = None
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._weight = 0
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, weight: int, generation: int) -> None:
+        weight = max(weight, 1)
+        with self._lock:
+            if generation != self.generation or weight > self.max_rows:
+                return
+            self._remove(key)
+            self._entries[key] = (value, weight)
+            self._weight += weight
+            while self._weight > self.max_rows:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._weight -= evicted
+                self.evictions += 1
+
+    def drone_changed(self, drone_id: int) -> None:
+        """Drop every listing and the detail entry for ``drone_id``."""
+        with self._lock:
+            self.generation += 1
+            for key in [key for key in self._entries if key[0] == "list"]:
+                self._remove(key)
+            self._remove(("drone", drone_id))
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def claim_revalidation(self) -> bool:
+        """True for the one caller that should re-read the shared version now."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.revalidate_seconds:
+                return False
+            self._checked_at = now
+            return True
+
+    def observe_version(self, version: int) -> None:
+        """Drop every entry if the ``drones`` version moved since the last check."""
+        with self._lock:
+            if version != self.data_version:
+                self._clear()
+                self.data_version = version
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "rows": self._weight,
+                "max_rows": self.max_rows,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self._weight = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._weight -= entry[1]
+
+
+class IdentityCache:
+    """Bounded TTL cache from bearer token to the identity it resolved to.
+
+    An entry never outlives its token's ``exp`` claim. Profile writes call
+    :meth:`invalidate_mobile` so the next request re-resolves the identity.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Any | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, token: str, identity: Any, token_exp: float | None = None) -> None:
+        if self.max_entries <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, time.monotonic() + (token_exp - time.time()))
+        with self._lock:
+            self._entries[token] = (identity, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_mobile(self, mobile: str) -> None:
+        with self._lock:
+            for token in [token for token, (identity, _) in self._entries.items() if identity.mobile == mobile]:
+                del self._entries[token]
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+@lru_cache()
+def get_catalog() -> CatalogCache:
+    settings = get_settings()
+    return CatalogCache(settings.catalog_cache_rows, settings.catalog_revalidate_seconds)
+
+
+@lru_cache()
+def get_identities() -> IdentityCache:
+    settings = get_settings()
+    return IdentityCache(settings.identity_cache_size, settings.identity_cache_ttl)
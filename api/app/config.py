@@ -5,7 +5,20 @@ import os
 from pydantic import BaseModel
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+APP_ENV = os.environ.get("APP_ENV", "development")
+
+
 class Settings(BaseModel):
+    app_env: str = APP_ENV
+    # Demo fixtures are loaded on startup unless disabled or running in production.
+    seed_demo: bool = _env_flag("SEED_DEMO", APP_ENV != "production")
     secret_key: str = os.environ.get("SECRET_KEY", "demo_secret_key")
     token_expire_minutes: int = int(os.environ.get("TOKEN_EXPIRE_MINUTES", 60 * 24))
     otp_code: str = os.environ.get("OTP_CODE", "1357")
@@ -21,6 +34,30 @@ class Settings(BaseModel):
         "UPLOAD_DIR",
         str((Path(__file__).resolve().parent.parent / "static" / "uploads").resolve()),
     )
+    upload_max_bytes: int = int(os.environ.get("UPLOAD_MAX_BYTES", 10 * 1024 * 1024))
+    db_pool_size: int = int(os.environ.get("DB_POOL_SIZE", 8))
+    db_pool_timeout: float = float(os.environ.get("DB_POOL_TIMEOUT", 10.0))
+    db_busy_timeout_ms: int = int(os.environ.get("DB_BUSY_TIMEOUT_MS", 5000))
+    db_cache_size_kib: int = int(os.environ.get("DB_CACHE_SIZE_KIB", 16 * 1024))
+    db_mmap_size: int = int(os.environ.get("DB_MMAP_SIZE", 128 * 1024 * 1024))
+    db_cached_statements: int = int(os.environ.get("DB_CACHED_STATEMENTS", 256))
+    # Group commit: the writer waits up to this long for more writes to share a transaction.
+    db_write_window_ms: float = float(os.environ.get("DB_WRITE_WINDOW_MS", 1.0))
+    db_write_batch_max: int = int(os.environ.get("DB_WRITE_BATCH_MAX", 64))
+    catalog_cache_rows: int = int(os.environ.get("CATALOG_CACHE_ROWS", 50_000))
+    catalog_revalidate_seconds: float = float(os.environ.get("CATALOG_REVALIDATE_SECONDS", 1.0))
+    identity_cache_size: int = int(os.environ.get("IDENTITY_CACHE_SIZE", 10_000))
+    identity_cache_ttl: float = float(os.environ.get("IDENTITY_CACHE_TTL", 300.0))
+    threadpool_size: int = int(os.environ.get("THREADPOOL_SIZE", 40))
+    metrics_enabled: bool = _env_flag("METRICS_ENABLED", True)
+    db_trace: bool = _env_flag("DB_TRACE", True)
+    db_slow_query_ms: float = float(os.environ.get("DB_SLOW_QUERY_MS", 100.0))
+    db_debug_headers: bool = _env_flag("DB_DEBUG_HEADERS", APP_ENV != "production")
+    events_queue_size: int = int(os.environ.get("EVENTS_QUEUE_SIZE", 256))
+    events_history: int = int(os.environ.get("EVENTS_HISTORY", 4096))
+    events_heartbeat_seconds: float = float(os.environ.get("EVENTS_HEARTBEAT_SECONDS", 15.0))
+    # How often each worker reads events published by the others.
+    events_poll_seconds: float = float(os.environ.get("EVENTS_POLL_SECONDS", 0.25))
 
 
 @lru_cache()
@@ -1,106 +1,405 @@
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import functools
+import queue
 import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Sequence
+from typing import Any, Callable, Iterator, Sequence, TypeVar
 
+from .cache import get_catalog, get_identities
 from .config import get_settings
+from .migrations import migrate
+from .slots import slot_bounds
+from .tracing import TracedConnection
 
 
-def db_connect() -> sqlite3.Connection:
+T = TypeVar("T")
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes free within ``db_pool_timeout``."""
+
+
+class ConnectionPool:
+    """Fixed-size pool of pre-configured SQLite connections.
+
+    A connection is handed to exactly one caller at a time, so it is safe to
+    reuse across threads even though it is opened with ``check_same_thread=False``.
+    Connections are configured once when opened and health-checked on checkout.
+    """
+
+    def __init__(self, database_path: str, size: int, timeout: float) -> None:
+        self.database_path = database_path
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    def acquire(self) -> sqlite3.Connection:
+        while True:
+            try:
+                con = self._idle.get_nowait()
+            except queue.Empty:
+                con = self._open_or_wait()
+            if _is_healthy(con):
+                return con
+            self._discard(con)
+
+    def release(self, con: sqlite3.Connection) -> None:
+        if self._closed:
+            self._discard(con)
+            return
+        try:
+            if con.in_transaction:
+                con.rollback()
+        except sqlite3.Error:
+            self._discard(con)
+            return
+        self._idle.put(con)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        con = self.acquire()
+        try:
+            yield con
+        finally:
+            self.release(con)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                con = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(con)
+
+    def _open_or_wait(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return db_connect(self.database_path)
+                except Exception:
+                    self._opened -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty as exc:
+            raise PoolTimeout(f"no database connection available after {self.timeout}s") from exc
+
+    def _discard(self, con: sqlite3.Connection) -> None:
+        with self._lock:
+            self._opened -= 1
+        try:
+            con.close()
+        except sqlite3.Error:
+            pass
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    pool = _pool
+    if pool is None:
+        with _pool_lock:
+            if _pool is None:
+                settings = get_settings()
+                _pool = ConnectionPool(settings.database_path, settings.db_pool_size, settings.db_pool_timeout)
+            pool = _pool
+    return pool
+
+
+def close_pool() -> None:
+    """Stop the database threads and the writer, then close every pooled connection."""
+    global _pool, _executor, _writer
+    with _pool_lock:
+        executor, _executor = _executor, None
+        writer, _writer = _writer, None
+    # Outside the lock: in-flight work may still need get_pool().
+    if executor is not None:
+        executor.shutdown(wait=True)
+    if writer is not None:
+        writer.close()
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Dedicated database threads, one per pooled connection.
+
+    Kept apart from the anyio threadpool so queries never queue behind
+    unrelated blocking work, and sized to the pool so a database thread
+    rarely waits for a connection.
+    """
+    global _executor
+    executor = _executor
+    if executor is None:
+        with _pool_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, get_settings().db_pool_size),
+                    thread_name_prefix="sqlite",
+                )
+            executor = _executor
+    return executor
+
+
+def executor_queue_depth() -> int:
+    """Database calls waiting for a free database thread."""
+    executor = _executor
+    # ThreadPoolExecutor has no public backlog accessor; its work queue is it.
+    return executor._work_queue.qsize() if executor is not None else 0
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await ``fn(con, *args, **kwargs)`` run on a database thread with a pooled connection.
+
+    ``fn`` is one unit of work: it may issue several statements and commit,
+    all on the same connection. Exceptions (including ``HTTPException``)
+    propagate to the awaiting handler. If the caller is cancelled the work
+    still finishes and the connection is returned to the pool.
+    """
+    loop = asyncio.get_running_loop()
+    # run_in_executor does not carry context variables; copy them so the
+    # request's query stats (see tracing) are charged from the database thread.
+    context = contextvars.copy_context()
+    call = functools.partial(_call_with_connection, fn, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(), context.run, call)
+
+
+def _call_with_connection(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    with get_pool().connection() as con:
+        return fn(con, *args, **kwargs)
+
+
+class _Write:
+    __slots__ = ("fn", "args", "kwargs", "context", "future")
+
+    def __init__(self, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        # Submitted from the request, so its query stats follow the write.
+        self.context = contextvars.copy_context()
+        self.future: Future[Any] = Future()
+
+
+class GroupCommitWriter:
+    """A single thread that performs every request-path write, committing in groups.
+
+    Callers queue ``fn(con, ...)`` and get a future. The thread takes the
+    first queued write, keeps collecting until ``window`` seconds have passed
+    or ``max_batch`` writes are in hand, and runs them all inside one
+    ``BEGIN IMMEDIATE`` transaction with one ``COMMIT``: one lock acquisition
+    and one WAL sync for the group instead of one per request. Each write
+    runs under its own savepoint, so one that raises is rolled back alone and
+    its exception goes to its caller only. Futures resolve after the commit.
+
+    ``fn`` must not begin, commit or roll back; the writer owns the
+    transaction. Holding the write lock for the whole group also makes each
+    write's checks and changes atomic.
+    """
+
+    def __init__(self, database_path: str, max_batch: int, window: float) -> None:
+        self.max_batch = max(1, max_batch)
+        self.window = max(0.0, window)
+        self.batches = 0
+        self.writes = 0
+        self.last_batch_size = 0
+        self.commit_seconds = 0.0
+        self._queue: queue.Queue[_Write | None] = queue.Queue()
+        self._closed = False
+        self._con = db_connect(database_path)
+        # Transactions are issued explicitly below, never implicitly by sqlite3.
+        self._con.isolation_level = None
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> Future[T]:
+        if self._closed:
+            raise RuntimeError("database writer is closed")
+        write = _Write(fn, args, kwargs)
+        self._queue.put(write)
+        return write.future
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def close(self) -> None:
+        """Finish every queued write, then stop the thread and close its connection."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._con.close()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            stopping = self._collect(batch)
+            self._commit(batch)
+
+    def _collect(self, batch: list[_Write]) -> bool:
+        """Add writes to ``batch`` until the window or size limit; True if asked to stop."""
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                write = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                return False
+            if write is None:
+                return True
+            batch.append(write)
+        return False
+
+    def _commit(self, batch: list[_Write]) -> None:
+        # Writes whose caller has already gone away are dropped unrun.
+        batch = [write for write in batch if write.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        con = self._con
+        outcomes: list[tuple[_Write, bool, Any]] = []
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            for write in batch:
+                con.execute("SAVEPOINT write")
+                try:
+                    result = write.context.run(write.fn, con, *write.args, **write.kwargs)
+                except Exception as exc:
+                    con.execute("ROLLBACK TO write")
+                    outcomes.append((write, False, exc))
+                else:
+                    outcomes.append((write, True, result))
+                con.execute("RELEASE write")
+            started = time.perf_counter()
+            con.execute("COMMIT")
+            self.commit_seconds += time.perf_counter() - started
+        except Exception as exc:
+            # The group itself failed (lock timeout, full disk, a savepoint a
+            # write broke); everything in it is rolled back and reported.
+            if con.in_transaction:
+                con.rollback()
+            for write in batch:
+                write.future.set_exception(exc)
+            return
+        finally:
+            self.batches += 1
+            self.writes += len(batch)
+            self.last_batch_size = len(batch)
+        for write, ok, value in outcomes:
+            if ok:
+                write.future.set_result(value)
+            else:
+                write.future.set_exception(value)
+
+
+_writer: GroupCommitWriter | None = None
+
+
+def get_writer() -> GroupCommitWriter:
+    global _writer
+    writer = _writer
+    if writer is None:
+        with _pool_lock:
+            if _writer is None:
+                settings = get_settings()
+                _writer = GroupCommitWriter(
+                    settings.database_path, settings.db_write_batch_max, settings.db_write_window_ms / 1000
+                )
+            writer = _writer
+    return writer
+
+
+def current_writer() -> GroupCommitWriter | None:
+    """The running writer, for metrics; None before the first write."""
+    return _writer
+
+
+async def run_write(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await ``fn(con, *args, **kwargs)`` run by the :class:`GroupCommitWriter`.
+
+    Use for request-path writes instead of :func:`run_db`; ``fn`` leaves
+    transaction control to the writer. Exceptions (including
+    ``HTTPException``) propagate, and the write has then been rolled back.
+    """
+    return await asyncio.wrap_future(get_writer().submit(fn, *args, **kwargs))
+
+
+def db_connect(database_path: str | None = None) -> sqlite3.Connection:
     settings = get_settings()
-    con = sqlite3.connect(settings.database_path, check_same_thread=False)
+    con = sqlite3.connect(
+        database_path or settings.database_path,
+        check_same_thread=False,
+        cached_statements=settings.db_cached_statements,
+        factory=TracedConnection if settings.db_trace else sqlite3.Connection,
+    )
+    if isinstance(con, TracedConnection) and settings.db_slow_query_ms > 0:
+        con.slow_query_seconds = settings.db_slow_query_ms / 1000
     con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute(f"PRAGMA busy_timeout={int(settings.db_busy_timeout_ms)}")
+    con.execute(f"PRAGMA cache_size=-{int(settings.db_cache_size_kib)}")
+    con.execute(f"PRAGMA mmap_size={int(settings.db_mmap_size)}")
     return con
 
 
-def init_db() -> None:
-    with db_cursor() as cur:
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS owners (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                mobile TEXT NOT NULL UNIQUE,
-                lat REAL,
-                lon REAL
-            );
-            """
-        )
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS drones (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                lat REAL NOT NULL,
-                lon REAL NOT NULL,
-                status TEXT NOT NULL DEFAULT 'Available',
-                price_per_hr REAL NOT NULL DEFAULT 500.0,
-                image_url TEXT,
-                battery_mah REAL,
-                capacity_liters REAL,
-                owner_id INTEGER NOT NULL,
-                FOREIGN KEY(owner_id) REFERENCES owners(id) ON DELETE CASCADE
-            );
-            """
-        )
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS drone_images (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                drone_id INTEGER NOT NULL,
-                url TEXT NOT NULL,
-                FOREIGN KEY(drone_id) REFERENCES drones(id) ON DELETE CASCADE
-            );
-            """
-        )
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS bookings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                drone_id INTEGER NOT NULL,
-                farmer_name TEXT NOT NULL,
-                booking_date TEXT NOT NULL,
-                duration_hrs INTEGER NOT NULL,
-                status TEXT NOT NULL DEFAULT 'Pending',
-                FOREIGN KEY(drone_id) REFERENCES drones(id) ON DELETE CASCADE
-            );
-            """
-        )
+def _is_healthy(con: sqlite3.Connection) -> bool:
+    try:
+        # A plain cursor: on a TracedConnection the check would be counted
+        # against the request as a query it never ran.
+        sqlite3.Cursor(con).execute("SELECT 1").fetchone()
+    except sqlite3.Error:
+        return False
+    return True
 
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS farmers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                mobile TEXT NOT NULL UNIQUE,
-                lat REAL,
-                lon REAL
-            );
-            """
-        )
 
-        # Ensure bookings table has farmer_mobile column for role-based lookups
-        existing_columns = {row["name"] for row in cur.execute("PRAGMA table_info(bookings)")}
-        if "farmer_mobile" not in existing_columns:
-            cur.execute("ALTER TABLE bookings ADD COLUMN farmer_mobile TEXT")
+def init_db() -> None:
+    with get_pool().connection() as con:
+        migrate(con)
+
 
-        drone_columns = {row["name"] for row in cur.execute("PRAGMA table_info(drones)")}
-        if "image_url" not in drone_columns:
-            cur.execute("ALTER TABLE drones ADD COLUMN image_url TEXT")
-        if "battery_mah" not in drone_columns:
-            cur.execute("ALTER TABLE drones ADD COLUMN battery_mah REAL")
-        if "capacity_liters" not in drone_columns:
-            cur.execute("ALTER TABLE drones ADD COLUMN capacity_liters REAL")
+def prepare_database(seed: bool) -> None:
+    init_db()
+    if seed:
+        seed_demo_data()
 
 
 def seed_demo_data() -> None:
     demo_bookings = _demo_bookings()
 
     with db_cursor() as cur:
-        current_rows = cur.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+        # Take the write lock before counting so processes starting together
+        # seed once; the others wait on busy_timeout and then see the rows.
+        cur.execute("BEGIN IMMEDIATE")
+        # Bounded count: stops after the demo size instead of scanning every booking.
+        current_rows = cur.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM bookings LIMIT ?)",
+            (len(demo_bookings),),
+        ).fetchone()[0]
         if current_rows >= len(demo_bookings):
             return
 
@@ -142,25 +441,28 @@ def seed_demo_data() -> None:
                 )
 
         for booking in demo_bookings:
+            booked_at = datetime.fromisoformat(booking[4].replace("Z", "+00:00"))
             cur.execute(
                 (
                     "INSERT INTO bookings(" \
-                    "id,drone_id,farmer_name,farmer_mobile,booking_date,duration_hrs,status" \
-                    ") VALUES(?,?,?,?,?,?,?)"
+                    "id,drone_id,farmer_name,farmer_mobile,booking_date,duration_hrs,status,starts_at,ends_at" \
+                    ") VALUES(?,?,?,?,?,?,?,?,?)"
                 ),
-                booking,
+                (*booking, *slot_bounds(booked_at, booking[5])),
             )
+    get_catalog().invalidate()
+    get_identities().invalidate()
 
 
 @contextmanager
-def db_cursor() -> sqlite3.Cursor:
-    con = db_connect()
-    cur = con.cursor()
-    try:
-        yield cur
-        con.commit()
-    finally:
-        con.close()
+def db_cursor() -> Iterator[sqlite3.Cursor]:
+    with get_pool().connection() as con:
+        cur = con.cursor()
+        try:
+            yield cur
+            con.commit()
+        finally:
+            cur.close()
 
 
 def truncate_tables() -> None:
@@ -170,6 +472,8 @@ def truncate_tables() -> None:
         cur.execute("DELETE FROM owners")
         cur.execute("DELETE FROM farmers")
         cur.execute("DELETE FROM drone_images")
+    get_catalog().invalidate()
+    get_identities().invalidate()
 
 
 def _demo_owners() -> Sequence[tuple[int, str, str, float, float]]:
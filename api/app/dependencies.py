@@ -1,37 +1,27 @@
 from __future__ import annotations
 
 import sqlite3
-from dataclasses import dataclass
-from typing import Generator
 
 from fastapi import Depends, Header, HTTPException, status
 
-from .db import db_connect
+from .cache import get_identities
+from .db import run_db
+from .identity import Identity
 from .models import UserRole
 from .security import jwt_decode
 
 
-async def get_db() -> Generator[sqlite3.Connection, None, None]:
-    con = db_connect()
-    try:
-        yield con
-    finally:
-        con.close()
-
-
-@dataclass
-class Identity:
-    mobile: str
-    role: UserRole
-
-
-def get_identity(
-    authorization: str | None = Header(None),
-    db: sqlite3.Connection = Depends(get_db),
-) -> Identity:
+async def get_identity(authorization: str | None = Header(None)) -> Identity:
+    # Async so a cached token resolves on the event loop without a thread hop;
+    # only a cache miss reaches the database threads.
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
     token = authorization.split(" ", 1)[1].strip()
+    identities = get_identities()
+    cached = identities.get(token)
+    if cached is not None:
+        return cached
+
     payload = jwt_decode(token)
     sub = payload.get("sub")
     if not sub:
@@ -42,25 +32,30 @@ def get_identity(
     except Exception as exc:  # ValueError for invalid role
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid role") from exc
 
+    identity = Identity(mobile=sub, role=role, profile_id=await run_db(_profile_id, role, sub))
+    identities.put(token, identity, payload.get("exp"))
+    return identity
+
+
+def _profile_id(db: sqlite3.Connection, role: UserRole, mobile: str) -> int:
     if role is UserRole.farmer:
-        row = db.execute("SELECT 1 FROM farmers WHERE mobile=?", (sub,)).fetchone()
+        row = db.execute("SELECT id FROM farmers WHERE mobile=?", (mobile,)).fetchone()
         if not row:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Farmer profile not found")
-    elif role is UserRole.owner:
-        row = db.execute("SELECT 1 FROM owners WHERE mobile=?", (sub,)).fetchone()
+    else:
+        row = db.execute("SELECT id FROM owners WHERE mobile=?", (mobile,)).fetchone()
         if not row:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Owner profile not found")
-
-    return Identity(mobile=sub, role=role)
+    return int(row["id"])
 
 
-def require_owner(identity: Identity = Depends(get_identity)) -> Identity:
+async def require_owner(identity: Identity = Depends(get_identity)) -> Identity:
     if identity.role is not UserRole.owner:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Owner access required")
     return identity
 
 
-def require_farmer(identity: Identity = Depends(get_identity)) -> Identity:
+async def require_farmer(identity: Identity = Depends(get_identity)) -> Identity:
     if identity.role is not UserRole.farmer:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Farmer access required")
     return identity
@@ -0,0 +1,273 @@
+"""Pub/sub for booking and drone changes, pushed to clients.
+
+Write handlers publish to per-user channels once their write has committed;
+``routers.events`` streams a user's channel over Server-Sent Events or a
+WebSocket. Published events go to the ``events`` table, and every worker
+process's hub tails it, so a subscriber hears about writes handled by any
+worker. Event ids are the table's row ids: a client that reconnects, to
+any worker, with the last id it saw is replayed what it missed from a
+bounded history. An id that has expired gets a ``reset`` event instead,
+telling the client to refetch.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+from collections import deque
+from functools import lru_cache
+from typing import Any, Iterable
+
+from .config import get_settings
+from .db import run_db, run_write
+from .identity import Identity
+from .models import UserRole
+
+
+logger = logging.getLogger(__name__)
+
+RESET = "reset"
+
+
+def owner_channel(owner_id: int) -> str:
+    return f"owner:{owner_id}"
+
+
+def farmer_channel(mobile: str) -> str:
+    return f"farmer:{mobile}"
+
+
+def booking_channels(owner_id: int, farmer_mobile: str | None) -> list[str]:
+    """Who hears about a booking: the drone's owner and, when known, the farmer."""
+    channels = [owner_channel(owner_id)]
+    if farmer_mobile:
+        channels.append(farmer_channel(farmer_mobile))
+    return channels
+
+
+def identity_channel(identity: Identity) -> str:
+    if identity.role is UserRole.owner:
+        return owner_channel(identity.profile_id)
+    return farmer_channel(identity.mobile)
+
+
+class Event:
+    __slots__ = ("id", "seq", "channels", "type", "data")
+
+    def __init__(self, event_id: str, seq: int, channels: frozenset[str], event_type: str, data: bytes) -> None:
+        self.id = event_id
+        self.seq = seq
+        self.channels = channels
+        self.type = event_type
+        # Serialised once at publish time and shared by every subscriber.
+        self.data = data
+
+
+class Subscription:
+    """One client's view of a channel: a bounded queue the hub fills.
+
+    A subscriber that lets its queue fill is cut off (``overflowed``)
+    rather than allowed to hold events in memory or slow the publisher; it
+    reconnects and resumes from its last event id.
+    """
+
+    def __init__(self, hub: EventHub, channel: str, max_queue: int) -> None:
+        self.hub = hub
+        self.channel = channel
+        self.queue: asyncio.Queue[Event | None] = asyncio.Queue(max_queue)
+        self.closed = False
+        self.overflowed = False
+
+    async def next(self, timeout: float) -> Event | None:
+        """The next event, or None on timeout or once the subscription is closed."""
+        if self.closed:
+            return None
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return None if self.closed else event
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+    def _deliver(self, event: Event) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.hub.dropped += 1
+            self.hub.unsubscribe(self)
+
+    def _wake(self) -> None:
+        # Wakes a waiting next(); a full queue means the reader is awake anyway.
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+
+class EventHub:
+    """Fan-out of events to subscriptions by channel, with a replay history.
+
+    :meth:`publish` appends to the ``events`` table and :meth:`poll` reads
+    what is new there, from this process or any other, into the history and
+    out to subscribers; :meth:`start` keeps polling every ``poll_seconds``.
+    Used from the event loop only, so nothing is locked except the poll.
+    """
+
+    def __init__(self, max_queue: int, history: int, poll_seconds: float) -> None:
+        self.max_queue = max(1, max_queue)
+        self.history = max(1, history)
+        self.poll_seconds = poll_seconds
+        self.published = 0
+        self.dropped = 0
+        self._seq = 0
+        self._history: deque[Event] = deque(maxlen=self.history)
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._closed = False
+        self._poll_lock = asyncio.Lock()
+        self._tail: asyncio.Task[None] | None = None
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    async def start(self) -> None:
+        """Load the recent history, then tail the table until :meth:`close`."""
+        rows = await run_db(_recent_events, self.history)
+        for row in reversed(rows):
+            self._append(_event(row))
+        self._tail = asyncio.create_task(self._follow())
+
+    async def publish(self, channels: Iterable[str], event_type: str, data: Any) -> str | None:
+        ids = await self.publish_all([(channels, event_type, data)])
+        return ids[0] if ids else None
+
+    async def publish_all(self, messages: Iterable[tuple[Iterable[str], str, Any]]) -> list[str]:
+        """Publish ``(channels, event_type, data)`` messages in one write; returns their ids.
+
+        Callers have already committed the change being announced, so a
+        failure here is logged rather than raised: the client misses the
+        event, not the response.
+        """
+        rows = [
+            (" ".join(channels), event_type, json.dumps(data, separators=(",", ":"), default=str).encode())
+            for channels, event_type, data in messages
+        ]
+        if not rows:
+            return []
+        try:
+            ids = await run_write(_insert_events, rows, self.history)
+        except sqlite3.Error:
+            logger.exception("Could not publish %d event(s)", len(rows))
+            return []
+        self.published += len(ids)
+        # Deliver to this process's subscribers now rather than at the next tick.
+        await self.poll()
+        return [str(event_id) for event_id in ids]
+
+    async def poll(self) -> None:
+        """Deliver every event added to the table since the last poll."""
+        async with self._poll_lock:
+            while not self._closed:
+                rows = await run_db(_events_after, self._seq, self.history)
+                for row in rows:
+                    self._dispatch(_event(row))
+                if len(rows) < self.history:
+                    return
+
+    def subscribe(self, channel: str, last_event_id: str | None = None) -> tuple[Subscription, list[Event]]:
+        """Start listening on ``channel``; also returns the events to replay first.
+
+        The replay is a single ``reset`` event when ``last_event_id`` cannot
+        be resumed from this hub's history.
+        """
+        subscription = Subscription(self, channel, self.max_queue)
+        if self._closed:
+            # Shutting down: the stream ends at once and the client reconnects elsewhere.
+            subscription.closed = True
+            return subscription, []
+        self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription, self._missed(channel, last_event_id)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.closed = True
+        subscriptions = self._subscribers.get(subscription.channel)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscribers[subscription.channel]
+        subscription._wake()
+
+    def close(self) -> None:
+        """End every subscription and refuse new ones, so open streams finish during shutdown."""
+        self._closed = True
+        if self._tail is not None:
+            self._tail.cancel()
+        for subscriptions in list(self._subscribers.values()):
+            for subscription in list(subscriptions):
+                self.unsubscribe(subscription)
+
+    async def _follow(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.poll()
+            except sqlite3.Error:
+                logger.exception("Could not read new events")
+
+    def _dispatch(self, event: Event) -> None:
+        self._append(event)
+        for channel in event.channels:
+            for subscription in list(self._subscribers.get(channel, ())):
+                subscription._deliver(event)
+
+    def _append(self, event: Event) -> None:
+        self._history.append(event)
+        self._seq = event.seq
+
+    def _missed(self, channel: str, last_event_id: str | None) -> list[Event]:
+        if not last_event_id:
+            return []
+        if not last_event_id.isdigit():
+            return [self._reset()]
+        after = int(last_event_id)
+        # Everything after ``after`` must still be held, or some was lost.
+        if after > self._seq or (self._history and self._history[0].seq > after + 1):
+            return [self._reset()]
+        return [event for event in self._history if event.seq > after and channel in event.channels]
+
+    def _reset(self) -> Event:
+        # Carries the current id so the client's next resume starts from here.
+        return Event(str(self._seq), self._seq, frozenset(), RESET, b"{}")
+
+
+def _event(row: sqlite3.Row) -> Event:
+    event_id, channels, event_type, data = row
+    return Event(str(event_id), event_id, frozenset(channels.split()), event_type, data)
+
+
+def _insert_events(con: sqlite3.Connection, rows: list[tuple[str, str, bytes]], keep: int) -> list[int]:
+    ids = [con.execute("INSERT INTO events(channels,type,data) VALUES(?,?,?)", row).lastrowid for row in rows]
+    # The table is only a replay buffer; keep as much of it as a hub holds.
+    con.execute("DELETE FROM events WHERE id <= ?", (ids[-1] - keep,))
+    return ids
+
+
+def _events_after(con: sqlite3.Connection, after: int, limit: int) -> list[sqlite3.Row]:
+    return con.execute(
+        "SELECT id,channels,type,data FROM events WHERE id > ? ORDER BY id LIMIT ?", (after, limit)
+    ).fetchall()
+
+
+def _recent_events(con: sqlite3.Connection, limit: int) -> list[sqlite3.Row]:
+    return con.execute("SELECT id,channels,type,data FROM events ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+
+
+@lru_cache()
+def get_hub() -> EventHub:
+    settings = get_settings()
+    return EventHub(settings.events_queue_size, settings.events_history, settings.events_poll_seconds)
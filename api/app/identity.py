@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from .models import UserRole
+
+
+@dataclass(frozen=True)
+class Identity:
+    """Who a request is acting as: the token's mobile and role, and the matching profile row."""
+
+    mobile: str
+    role: UserRole
+    profile_id: int
@@ -0,0 +1,431 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime
+from typing import Callable, Sequence
+
+
+Migration = Callable[[sqlite3.Connection], None]
+
+
+def _m001_base_schema(con: sqlite3.Connection) -> None:
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS owners (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            mobile TEXT NOT NULL UNIQUE,
+            lat REAL,
+            lon REAL
+        );
+        """
+    )
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS drones (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            lat REAL NOT NULL,
+            lon REAL NOT NULL,
+            status TEXT NOT NULL DEFAULT 'Available',
+            price_per_hr REAL NOT NULL DEFAULT 500.0,
+            image_url TEXT,
+            battery_mah REAL,
+            capacity_liters REAL,
+            owner_id INTEGER NOT NULL,
+            FOREIGN KEY(owner_id) REFERENCES owners(id) ON DELETE CASCADE
+        );
+        """
+    )
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS drone_images (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            drone_id INTEGER NOT NULL,
+            url TEXT NOT NULL,
+            FOREIGN KEY(drone_id) REFERENCES drones(id) ON DELETE CASCADE
+        );
+        """
+    )
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            drone_id INTEGER NOT NULL,
+            farmer_name TEXT NOT NULL,
+            booking_date TEXT NOT NULL,
+            duration_hrs INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'Pending',
+            FOREIGN KEY(drone_id) REFERENCES drones(id) ON DELETE CASCADE
+        );
+        """
+    )
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS farmers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            mobile TEXT NOT NULL UNIQUE,
+            lat REAL,
+            lon REAL
+        );
+        """
+    )
+
+    # Databases created before versioning may lack columns added later on.
+    existing_columns = {row[1] for row in con.execute("PRAGMA table_info(bookings)")}
+    if "farmer_mobile" not in existing_columns:
+        con.execute("ALTER TABLE bookings ADD COLUMN farmer_mobile TEXT")
+
+    drone_columns = {row[1] for row in con.execute("PRAGMA table_info(drones)")}
+    if "image_url" not in drone_columns:
+        con.execute("ALTER TABLE drones ADD COLUMN image_url TEXT")
+    if "battery_mah" not in drone_columns:
+        con.execute("ALTER TABLE drones ADD COLUMN battery_mah REAL")
+    if "capacity_liters" not in drone_columns:
+        con.execute("ALTER TABLE drones ADD COLUMN capacity_liters REAL")
+
+
+def _m002_hot_path_indexes(con: sqlite3.Connection) -> None:
+    # Farmer booking list: WHERE farmer_mobile=? ORDER BY booking_date.
+    con.execute(
+        "CREATE INDEX IF NOT EXISTS idx_bookings_farmer_date ON bookings(farmer_mobile, booking_date)"
+    )
+    # Owner booking list joins bookings to the owner's drones.
+    con.execute("CREATE INDEX IF NOT EXISTS idx_bookings_drone_date ON bookings(drone_id, booking_date)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_drones_owner ON drones(owner_id)")
+    # Covering index so image lookups never touch the table.
+    con.execute("CREATE INDEX IF NOT EXISTS idx_drone_images_drone ON drone_images(drone_id, id, url)")
+
+
+def _m003_drone_spatial_index(con: sqlite3.Connection) -> None:
+    # R*Tree over drone positions; triggers keep it in step with every write
+    # path (API handlers, demo seeding, truncation) without touching them.
+    con.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS drones_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+    )
+    con.execute(
+        "CREATE TRIGGER IF NOT EXISTS drones_rtree_insert AFTER INSERT ON drones BEGIN "
+        "INSERT OR REPLACE INTO drones_rtree VALUES(new.id, new.lat, new.lat, new.lon, new.lon); END"
+    )
+    con.execute(
+        "CREATE TRIGGER IF NOT EXISTS drones_rtree_update AFTER UPDATE OF id, lat, lon ON drones BEGIN "
+        "DELETE FROM drones_rtree WHERE id=old.id; "
+        "INSERT OR REPLACE INTO drones_rtree VALUES(new.id, new.lat, new.lat, new.lon, new.lon); END"
+    )
+    con.execute(
+        "CREATE TRIGGER IF NOT EXISTS drones_rtree_delete AFTER DELETE ON drones BEGIN "
+        "DELETE FROM drones_rtree WHERE id=old.id; END"
+    )
+    con.execute("INSERT OR REPLACE INTO drones_rtree SELECT id, lat, lat, lon, lon FROM drones")
+
+
+def _m004_drone_filter_indexes(con: sqlite3.Connection) -> None:
+    # Serve the GET /drones attribute filters; each also yields rows in price order.
+    con.execute("CREATE INDEX IF NOT EXISTS idx_drones_price ON drones(price_per_hr)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_drones_type_price ON drones(type, price_per_hr)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_drones_status_price ON drones(status, price_per_hr)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_drones_battery ON drones(battery_mah)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_drones_capacity ON drones(capacity_liters)")
+
+
+def _bump(*scopes: str) -> str:
+    values = ", ".join(f"({scope}, 1)" for scope in scopes)
+    return (
+        f"INSERT INTO data_versions(scope, version) VALUES {values} "
+        "ON CONFLICT(scope) DO UPDATE SET version = version + 1;"
+    )
+
+
+def _m005_data_versions(con: sqlite3.Connection) -> None:
+    # Monotonic per-scope counters behind the ETags. Triggers bump them inside
+    # the writing transaction, so a version can never run ahead of its data.
+    con.execute(
+        "CREATE TABLE IF NOT EXISTS data_versions ("
+        "scope TEXT PRIMARY KEY, version INTEGER NOT NULL) WITHOUT ROWID"
+    )
+    owner_of = "(SELECT owner_id FROM drones WHERE id={row}.drone_id)"
+    triggers = {
+        "drones": {
+            "INSERT": _bump("'drones'", "'owner_drones:' || new.owner_id"),
+            "UPDATE": _bump("'drones'", "'owner_drones:' || old.owner_id", "'owner_drones:' || new.owner_id"),
+            "DELETE": _bump("'drones'", "'owner_drones:' || old.owner_id"),
+        },
+        "drone_images": {
+            "INSERT": _bump("'drones'", f"'owner_drones:' || COALESCE({owner_of.format(row='new')}, '')"),
+            "UPDATE": _bump("'drones'", f"'owner_drones:' || COALESCE({owner_of.format(row='new')}, '')"),
+            "DELETE": _bump("'drones'", f"'owner_drones:' || COALESCE({owner_of.format(row='old')}, '')"),
+        },
+        "bookings": {
+            event: _bump(
+                f"'owner_bookings:' || COALESCE({owner_of.format(row=row)}, '')",
+                f"'farmer_bookings:' || COALESCE({row}.farmer_mobile, '')",
+            )
+            for event, row in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old"))
+        },
+    }
+    for table, events in triggers.items():
+        for event, body in events.items():
+            con.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()} "
+                f"AFTER {event} ON {table} BEGIN {body} END"
+            )
+    # A booking moving between drones or farmers also changes the old scopes.
+    con.execute(
+        "CREATE TRIGGER IF NOT EXISTS bookings_version_update_old AFTER UPDATE OF drone_id, farmer_mobile "
+        "ON bookings BEGIN "
+        + _bump(
+            f"'owner_bookings:' || COALESCE({owner_of.format(row='old')}, '')",
+            "'farmer_bookings:' || COALESCE(old.farmer_mobile, '')",
+        )
+        + " END"
+    )
+
+
+# Slot timestamps are naive UTC "YYYY-MM-DDTHH:MM:SS" strings, so SQL string
+# comparison is chronological. Only these statuses hold a slot.
+SLOT_FORMAT = "%Y-%m-%dT%H:%M:%S"
+ACTIVE_BOOKING_STATUSES = ("Pending", "Accepted")
+
+
+def _epoch_minute(expr: str, round_up: bool = False) -> str:
+    seconds = f"CAST(strftime('%s', {expr}) AS INTEGER)"
+    return f"(({seconds} + 59) / 60)" if round_up else f"({seconds} / 60)"
+
+
+_ACTIVE_SQL = ", ".join(f"'{status}'" for status in ACTIVE_BOOKING_STATUSES)
+# Rebuilds booking_slots from the bookings table, for loads that bypass the triggers.
+BOOKING_SLOTS_BACKFILL = (
+    "INSERT OR REPLACE INTO booking_slots "
+    f"SELECT id, drone_id, drone_id, {_epoch_minute('starts_at')}, {_epoch_minute('ends_at', round_up=True)} "
+    f"FROM bookings WHERE status IN ({_ACTIVE_SQL}) AND starts_at IS NOT NULL AND ends_at IS NOT NULL"
+)
+
+
+def _m006_booking_slots(con: sqlite3.Connection) -> None:
+    # Bookings become time slots [starts_at, ends_at). Existing rows start at
+    # booking_date and run for duration_hrs.
+    columns = {row[1] for row in con.execute("PRAGMA table_info(bookings)")}
+    for column in ("starts_at", "ends_at"):
+        if column not in columns:
+            con.execute(f"ALTER TABLE bookings ADD COLUMN {column} TEXT")
+    con.execute(
+        f"UPDATE bookings SET starts_at = strftime('{SLOT_FORMAT}', booking_date), "
+        f"ends_at = strftime('{SLOT_FORMAT}', booking_date, '+' || duration_hrs || ' hours') "
+        "WHERE starts_at IS NULL"
+    )
+    # Two-dimensional R*Tree over (drone, minute): an overlap test for one
+    # drone, or for every drone in a NOT EXISTS, is a single index probe no
+    # matter how much booking history a drone has. Minutes are rounded
+    # outwards, so the index may over-match within a minute; callers recheck
+    # the exact timestamps on the joined booking row.
+    con.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS booking_slots "
+        "USING rtree_i32(id, min_drone, max_drone, min_minute, max_minute)"
+    )
+    slot = (
+        f"new.id, new.drone_id, new.drone_id, {_epoch_minute('new.starts_at')}, "
+        f"{_epoch_minute('new.ends_at', round_up=True)}"
+    )
+    holds_slot = f"new.status IN ({_ACTIVE_SQL}) AND new.starts_at IS NOT NULL AND new.ends_at IS NOT NULL"
+    con.execute(
+        f"CREATE TRIGGER IF NOT EXISTS booking_slots_insert AFTER INSERT ON bookings WHEN {holds_slot} BEGIN "
+        f"INSERT OR REPLACE INTO booking_slots VALUES({slot}); END"
+    )
+    con.execute(
+        "CREATE TRIGGER IF NOT EXISTS booking_slots_update "
+        "AFTER UPDATE OF drone_id, starts_at, ends_at, status ON bookings BEGIN "
+        "DELETE FROM booking_slots WHERE id=old.id; "
+        f"INSERT INTO booking_slots SELECT {slot} WHERE {holds_slot}; END"
+    )
+    con.execute(
+        "CREATE TRIGGER IF NOT EXISTS booking_slots_delete AFTER DELETE ON bookings BEGIN "
+        "DELETE FROM booking_slots WHERE id=old.id; END"
+    )
+    con.execute(BOOKING_SLOTS_BACKFILL)
+
+
+def _m007_events(con: sqlite3.Connection) -> None:
+    # Published events, tailed by every worker process so a stream hears about
+    # writes handled by any of them. The ids are the event ids clients resume
+    # from; AUTOINCREMENT keeps them from being reused after pruning.
+    con.execute(
+        "CREATE TABLE IF NOT EXISTS events ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, channels TEXT NOT NULL, type TEXT NOT NULL, data BLOB NOT NULL)"
+    )
+
+
+MIGRATIONS: Sequence[tuple[int, str, Migration]] = (
+    (1, "base schema", _m001_base_schema),
+    (2, "secondary indexes for hot queries", _m002_hot_path_indexes),
+    (3, "R*Tree spatial index on drone positions", _m003_drone_spatial_index),
+    (4, "indexes for drone attribute filters", _m004_drone_filter_indexes),
+    (5, "per-scope data versions for ETags", _m005_data_versions),
+    (6, "booking time slots with an interval index", _m006_booking_slots),
+    (7, "event log shared by worker processes", _m007_events),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(con: sqlite3.Connection) -> int:
+    try:
+        row = con.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:  # schema_version not created yet
+        return 0
+    return int(row[0] or 0)
+
+
+def migrate(con: sqlite3.Connection) -> int:
+    """Apply pending migrations and return the resulting schema version.
+
+    Returns immediately, without touching the schema, once the stored version
+    is current. Each migration runs in its own ``BEGIN IMMEDIATE`` transaction
+    so concurrent workers starting together apply it exactly once.
+    """
+    if current_version(con) >= LATEST_VERSION:
+        return LATEST_VERSION
+
+    con.execute(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, description TEXT NOT NULL, applied_at TEXT NOT NULL)"
+    )
+    for version, description, apply in MIGRATIONS:
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            if current_version(con) >= version:
+                con.rollback()
+                continue
+            apply(con)
+            con.execute(
+                "INSERT INTO schema_version(version,description,applied_at) VALUES(?,?,?)",
+                (version, description, datetime.utcnow().isoformat()),
+            )
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+    return current_version(con)
+
+
+HOT_QUERIES: Sequence[tuple[str, str, tuple]] = (
+    (
+        "farmer bookings",
+        "SELECT id,drone_id,farmer_name,farmer_mobile,booking_date,duration_hrs,status,starts_at,ends_at "
+        "FROM bookings WHERE farmer_mobile=? ORDER BY booking_date DESC, id DESC",
+        ("7100000000",),
+    ),
+    (
+        "farmer bookings page",
+        "SELECT id,drone_id,farmer_name,farmer_mobile,booking_date,duration_hrs,status,starts_at,ends_at "
+        "FROM bookings WHERE farmer_mobile=? AND (booking_date, id) < (?, ?) "
+        "ORDER BY booking_date DESC, id DESC LIMIT ?",
+        ("7100000000", "2025-10-29T12:00:00Z", 20, 51),
+    ),
+    (
+        "farmer bookings export",
+        "SELECT b.id,b.drone_id,b.farmer_name,b.farmer_mobile,b.booking_date,b.duration_hrs,b.status,b.starts_at,b.ends_at "
+        "FROM bookings b WHERE b.farmer_mobile=? AND b.booking_date >= ? AND b.booking_date < ? "
+        "ORDER BY b.booking_date DESC, b.id DESC",
+        ("7100000000", "2025-10-01T00:00:00", "2025-11-01T00:00:00"),
+    ),
+    (
+        "owner bookings",
+        "SELECT b.id,b.drone_id,b.farmer_name,b.farmer_mobile,b.booking_date,b.duration_hrs,b.status,b.starts_at,b.ends_at "
+        "FROM bookings b JOIN drones d ON b.drone_id = d.id WHERE d.owner_id=? ORDER BY b.booking_date DESC, b.id DESC",
+        (1,),
+    ),
+    (
+        "owner bookings export",
+        "SELECT b.id,b.drone_id,b.farmer_name,b.farmer_mobile,b.booking_date,b.duration_hrs,b.status,b.starts_at,b.ends_at "
+        "FROM bookings b JOIN drones d ON b.drone_id = d.id WHERE d.owner_id=? "
+        "AND b.booking_date >= ? AND b.booking_date < ? ORDER BY b.booking_date DESC, b.id DESC",
+        (1, "2025-10-01T00:00:00", "2025-11-01T00:00:00"),
+    ),
+    (
+        "owner drones",
+        "SELECT id,name,type,lat,lon,status,price_per_hr,image_url,battery_mah,capacity_liters,owner_id "
+        "FROM drones WHERE owner_id=?",
+        (1,),
+    ),
+    (
+        "drone images",
+        "SELECT drone_id,url FROM drone_images WHERE drone_id IN (?,?,?) ORDER BY id",
+        (1, 2, 3),
+    ),
+    (
+        "drones within radius",
+        "SELECT d.id,d.lat,d.lon FROM drones_rtree r CROSS JOIN drones d ON d.id = r.id "
+        "WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ?",
+        (25.5, 25.7, 85.0, 85.2),
+    ),
+    (
+        "drones by type and price",
+        "SELECT d.id FROM drones d WHERE d.type = ? AND d.price_per_hr <= ? ORDER BY d.price_per_hr, d.id",
+        ("Spray", 10000.0),
+    ),
+    (
+        "drones by status",
+        "SELECT d.id FROM drones d WHERE d.status = ?",
+        ("Available",),
+    ),
+    (
+        "drones by price range",
+        "SELECT d.id FROM drones d WHERE d.price_per_hr >= ? AND d.price_per_hr <= ? ORDER BY d.price_per_hr, d.id",
+        (9000.0, 11000.0),
+    ),
+    (
+        "drone slot overlap",
+        "SELECT 1 FROM booking_slots s CROSS JOIN bookings b ON b.id = s.id "
+        "WHERE s.min_drone <= ? AND s.max_drone >= ? AND s.min_minute < ? AND s.max_minute > ? "
+        "AND b.starts_at < ? AND b.ends_at > ? LIMIT 1",
+        (1, 1, 29_352_000, 29_351_800, "2025-10-21T12:00:00", "2025-10-21T09:00:00"),
+    ),
+    (
+        "free drones within radius",
+        "SELECT d.id FROM drones_rtree r CROSS JOIN drones d ON d.id = r.id "
+        "WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ? "
+        "AND d.status != 'Maintenance' AND NOT EXISTS (SELECT 1 FROM booking_slots s "
+        "CROSS JOIN bookings b ON b.id = s.id WHERE s.min_drone <= d.id AND s.max_drone >= d.id "
+        "AND s.min_minute < ? AND s.max_minute > ? AND b.starts_at < ? AND b.ends_at > ?)",
+        (25.5, 25.7, 85.0, 85.2, 29_352_000, 29_351_800, "2025-10-21T12:00:00", "2025-10-21T09:00:00"),
+    ),
+    (
+        "drones by capacity",
+        "SELECT d.id FROM drones d WHERE d.capacity_liters >= ?",
+        (30.0,),
+    ),
+    (
+        "event tail",
+        "SELECT id,channels,type,data FROM events WHERE id > ? ORDER BY id LIMIT ?",
+        (0, 4096),
+    ),
+)
+
+
+def explain_hot_queries(con: sqlite3.Connection) -> dict[str, list[str]]:
+    plans: dict[str, list[str]] = {}
+    for name, sql, params in HOT_QUERIES:
+        plans[name] = [row[3] for row in con.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    return plans
+
+
+def assert_indexed_plans(con: sqlite3.Connection) -> None:
+    """Raise ``AssertionError`` if any hot query's plan contains a full SCAN."""
+    offenders = {
+        name: steps
+        for name, steps in explain_hot_queries(con).items()
+        if any(_is_full_scan(step) for step in steps)
+    }
+    if offenders:
+        raise AssertionError(f"Hot queries fall back to table scans: {offenders}")
+
+
+def _is_full_scan(step: str) -> bool:
+    if not step.startswith("SCAN"):
+        return False
+    # R*Tree lookups are reported as "SCAN r VIRTUAL TABLE INDEX 2:<constraints>";
+    # only an empty constraint list means every entry is visited.
+    _, sep, constraints = step.partition("VIRTUAL TABLE INDEX ")
+    return not sep or constraints.endswith(":")
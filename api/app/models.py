@@ -1,10 +1,34 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Optional, List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer
+
+
+# Most items accepted by one batch write request.
+MAX_BATCH_SIZE = 500
+
+
+def api_timestamp(value: datetime | str) -> str:
+    """The one wire format for timestamps: UTC, millisecond precision, ``Z`` suffix.
+
+    Stored values are naive UTC or end in ``Z`` depending on who wrote them;
+    naive values are taken as UTC.
+    """
+    if isinstance(value, str):
+        # The shapes this app stores are rewritten by slicing; anything else is parsed.
+        if len(value) >= 19 and value[10] == "T":
+            tail = value[19:]
+            if tail in ("", "Z"):
+                return value[:19] + ".000Z"
+            if len(tail) == 7 and tail[0] == ".":
+                return value[:23] + "Z"
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="milliseconds") + "Z"
 
 
 class UserRole(str, Enum):
@@ -71,12 +95,15 @@ class DroneOut(DroneBase):
     image_urls: Optional[List[str]] = None
     battery_mah: Optional[float] = None
     capacity_liters: Optional[float] = None
+    distance_km: Optional[float] = None
 
 
 class BookingCreate(BaseModel):
     drone_id: int
     farmer_name: Optional[str] = None
     duration_hrs: int = Field(gt=0)
+    # Start of the slot; defaults to now. The slot ends duration_hrs later.
+    starts_at: Optional[datetime] = None
 
 
 class BookingOut(BaseModel):
@@ -87,6 +114,16 @@ class BookingOut(BaseModel):
     booking_date: datetime
     duration_hrs: int
     status: str
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+
+    @field_serializer("booking_date", "starts_at", "ends_at")
+    def _timestamp(self, value: datetime | None) -> str | None:
+        return None if value is None else api_timestamp(value)
+
+
+class DroneBatchCreate(BaseModel):
+    drones: List[DroneCreate] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
 
 
 class AvailabilityUpdate(BaseModel):
@@ -97,6 +134,23 @@ class BookingStatusUpdate(BaseModel):
     status: str
 
 
+class BookingStatusItem(BaseModel):
+    id: int
+    status: str
+
+
+class BookingBatchUpdate(BaseModel):
+    bookings: List[BookingStatusItem] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class BookingBatchResult(BaseModel):
+    id: int
+    # HTTP status the item would have got from PATCH /bookings/{id}.
+    status_code: int
+    status: Optional[str] = None
+    detail: Optional[str] = None
+
+
 class AssetUploadRequest(BaseModel):
     data: str
     filename: Optional[str] = None
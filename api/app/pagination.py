@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import base64
+import json
+from typing import Callable, Sequence, TypeVar
+
+from fastapi import HTTPException, Response, status
+
+
+T = TypeVar("T")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str | None, arity: int) -> list | None:
+    """Decode an opaque cursor into its ``arity`` sort-key values."""
+    if cursor is None:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception as exc:  # noqa: BLE001 - any decoding failure means a bad cursor
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != arity:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def split_page(items: list[T], limit: int | None, key: Callable[[T], Sequence]) -> tuple[list[T], str | None]:
+    """Trim ``items`` (fetched with ``limit + 1``) and return the next cursor, if any."""
+    if limit is None or len(items) <= limit:
+        return items, None
+    page = items[:limit]
+    return page, encode_cursor(key(page[-1]))
+
+
+def set_next_cursor(response: Response, next_cursor: str | None) -> None:
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
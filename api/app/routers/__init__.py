@@ -1,3 +1,3 @@
-from . import auth, drones, bookings, owners, assets
+from . import auth, drones, bookings, owners, assets, events
 
-__all__ = ["auth", "drones", "bookings", "owners", "assets"]
+__all__ = ["auth", "drones", "bookings", "owners", "assets", "events"]
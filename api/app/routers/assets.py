@@ -1,38 +1,152 @@
 from __future__ import annotations
 
 import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
 from pathlib import Path
-from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from anyio import to_thread
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
-from ..config import get_settings
+from ..config import Settings, get_settings
 from ..models import AssetUploadRequest, AssetUploadResponse
+from ..static import precompress
 
 
 router = APIRouter()
 
+UPLOAD_URL_PREFIX = "/static/uploads"
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+    "image/heic": "heic",
+}
+_EXTENSION = re.compile(r"^[a-z0-9]{1,8}$")
 
-def _ensure_upload_dir(path: Path) -> None:
-    path.mkdir(parents=True, exist_ok=True)
+
+class AssetWriter:
+    """Write an upload to a temporary file in ``upload_root``, hashing as it goes.
+
+    :meth:`commit` renames the file to its SHA-256 name in one atomic step,
+    so a reader never sees a partial image and identical uploads share one
+    file. Compressible formats get a ``.gz`` variant written next to it.
+    Blocking; async callers run each call in a worker thread.
+    """
+
+    def __init__(self, upload_root: Path, max_bytes: int) -> None:
+        upload_root.mkdir(parents=True, exist_ok=True)
+        self.upload_root = upload_root
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._digest = hashlib.sha256()
+        # Same directory as the target, so the final rename never crosses filesystems.
+        self._file = tempfile.NamedTemporaryFile(dir=upload_root, prefix=".upload-", delete=False)
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise _too_large(self.max_bytes)
+        self._digest.update(chunk)
+        self._file.write(chunk)
+
+    def commit(self, extension: str) -> str:
+        """Publish the upload and return its file name."""
+        if self.size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty upload")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        filename = f"{self._digest.hexdigest()}.{extension}"
+        target = self.upload_root / filename
+        if target.exists():
+            # Already stored; the content is identical by construction.
+            os.unlink(self._file.name)
+        else:
+            os.chmod(self._file.name, 0o644)
+            os.replace(self._file.name, target)
+            precompress(target)
+        return filename
+
+    def discard(self) -> None:
+        self._file.close()
+        try:
+            os.unlink(self._file.name)
+        except FileNotFoundError:
+            pass
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Upload exceeds {max_bytes} bytes",
+    )
+
+
+def _extension(value: str | None, default: str = "jpg") -> str:
+    extension = (value or default).lstrip(".").lower()
+    if extension == "jpeg":
+        extension = "jpg"
+    if not _EXTENSION.match(extension):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file extension")
+    return extension
+
+
+@router.post("/upload/raw", response_model=AssetUploadResponse)
+async def upload_asset_raw(
+    request: Request,
+    extension: str | None = Query(default=None),
+    settings: Settings = Depends(get_settings),
+) -> AssetUploadResponse:
+    """Store the raw request body as an image, streamed to disk in chunks.
+
+    The extension comes from ``extension`` or else the ``Content-Type``.
+    A declared ``Content-Length`` over ``upload_max_bytes`` is rejected
+    before the body is read; chunked bodies are cut off once they exceed it.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    suffix = _extension(extension, CONTENT_TYPE_EXTENSIONS.get(content_type, "jpg"))
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > settings.upload_max_bytes:
+        raise _too_large(settings.upload_max_bytes)
+
+    writer = await to_thread.run_sync(AssetWriter, Path(settings.upload_dir), settings.upload_max_bytes)
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await to_thread.run_sync(writer.write, chunk)
+        filename = await to_thread.run_sync(writer.commit, suffix)
+    except BaseException:
+        await to_thread.run_sync(writer.discard)
+        raise
+    return AssetUploadResponse(url=f"{UPLOAD_URL_PREFIX}/{filename}")
 
 
 @router.post("/upload", response_model=AssetUploadResponse)
-def upload_asset(payload: AssetUploadRequest, settings=Depends(get_settings)) -> AssetUploadResponse:
-    upload_root = Path(settings.upload_dir)
-    _ensure_upload_dir(upload_root)
+def upload_asset(payload: AssetUploadRequest, settings: Settings = Depends(get_settings)) -> AssetUploadResponse:
+    """Compatibility shim for base64 JSON uploads; prefer ``/upload/raw``.
 
+    The image is stored under its content hash like a raw upload. ``filename``
+    only contributes its extension when ``extension`` is not given.
+    """
+    if len(payload.data) * 3 // 4 > settings.upload_max_bytes:
+        raise _too_large(settings.upload_max_bytes)
     try:
         data = base64.b64decode(payload.data)
-    except Exception as exc:  # noqa: BLE001
+    except (binascii.Error, ValueError) as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid base64 data") from exc
 
-    suffix = (payload.extension or "jpg").lstrip(".")
-    filename = payload.filename or f"drone-{uuid4().hex}.{suffix}"
-    target = upload_root / filename
-
-    with target.open("wb") as fp:
-        fp.write(data)
-
-    relative_url = f"/static/uploads/{filename}"
-    return AssetUploadResponse(url=relative_url)
+    default = Path(payload.filename).suffix if payload.filename else ""
+    suffix = _extension(payload.extension or default or None)
+    writer = AssetWriter(Path(settings.upload_dir), settings.upload_max_bytes)
+    try:
+        writer.write(data)
+        filename = writer.commit(suffix)
+    except BaseException:
+        writer.discard()
+        raise
+    return AssetUploadResponse(url=f"{UPLOAD_URL_PREFIX}/{filename}")
@@ -4,97 +4,314 @@ import sqlite3
 from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
-from ..dependencies import Identity, get_db, get_identity, require_farmer, require_owner
-from ..models import BookingCreate, BookingOut, BookingStatusUpdate, UserRole
+from ..cache import get_catalog
+from ..db import run_db, run_write
+from ..dependencies import Identity, get_identity, require_farmer, require_owner
+from ..events import booking_channels, get_hub, owner_channel
+from ..export import iso_bound, stream_query
+from ..migrations import ACTIVE_BOOKING_STATUSES
+from ..models import (
+    BookingBatchResult,
+    BookingBatchUpdate,
+    BookingCreate,
+    BookingOut,
+    BookingStatusItem,
+    BookingStatusUpdate,
+    UserRole,
+)
+from ..pagination import MAX_PAGE_SIZE, decode_cursor, set_next_cursor, split_page
+from ..serialization import RowSerializer, json_response
+from ..slots import overlap_clause, overlap_params, slot_bounds
+from ..versions import data_version, make_etag, matches, not_modified, set_etag
 
 
+BOOKING_ROWS = RowSerializer(BookingOut)
+# Exported as the JSON API serialises them.
+BOOKING_TIMESTAMPS = ("booking_date", "starts_at", "ends_at")
+BOOKING_STATUSES = ("Pending", "Accepted", "Rejected")
+
 router = APIRouter()
 
 
 @router.get("/", response_model=List[BookingOut])
-def list_bookings(
+async def list_bookings(
+    request: Request,
     status: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
     identity: Identity = Depends(get_identity),
-    db: sqlite3.Connection = Depends(get_db),
-) -> List[BookingOut]:
+) -> Response:
+    after = decode_cursor(cursor, 2)
     params: list = []
     if identity.role is UserRole.owner:
-        owner = db.execute("SELECT id FROM owners WHERE mobile=?", (identity.mobile,)).fetchone()
-        if not owner:
-            raise HTTPException(status_code=404, detail="Owner not found")
         query = (
-            "SELECT b.id,b.drone_id,b.farmer_name,b.farmer_mobile,b.booking_date,b.duration_hrs,b.status "
+            "SELECT b.id,b.drone_id,b.farmer_name,b.farmer_mobile,b.booking_date,b.duration_hrs,b.status,b.starts_at,b.ends_at "
             "FROM bookings b JOIN drones d ON b.drone_id = d.id WHERE d.owner_id=?"
         )
-        params.append(owner["id"])
+        params.append(identity.profile_id)
+        scope = f"owner_bookings:{identity.profile_id}"
         if status:
             query += " AND b.status=?"
             params.append(status)
+        if after is not None:
+            query += " AND (b.booking_date, b.id) < (?, ?)"
+            params.extend(after)
+        query += " ORDER BY b.booking_date DESC, b.id DESC"
     else:
         query = (
-            "SELECT id,drone_id,farmer_name,farmer_mobile,booking_date,duration_hrs,status "
+            "SELECT id,drone_id,farmer_name,farmer_mobile,booking_date,duration_hrs,status,starts_at,ends_at "
             "FROM bookings WHERE farmer_mobile=?"
         )
         params.append(identity.mobile)
+        scope = f"farmer_bookings:{identity.mobile}"
         if status:
             query += " AND status=?"
             params.append(status)
+        if after is not None:
+            query += " AND (booking_date, id) < (?, ?)"
+            params.extend(after)
+        query += " ORDER BY booking_date DESC, id DESC"
+
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit + 1)
+
+    rows, etag = await run_db(_load_bookings, request, scope, query, tuple(params))
+    if rows is None:
+        return not_modified(etag, private=True)
+    rows, next_cursor = split_page(rows, limit, lambda row: (row["booking_date"], row["id"]))
+    response = json_response(BOOKING_ROWS.dump(rows))
+    set_etag(response, etag, private=True)
+    set_next_cursor(response, next_cursor)
+    return response
 
-    query += " ORDER BY booking_date DESC"
-    rows = db.execute(query, tuple(params)).fetchall()
-    return [BookingOut(**dict(row)) for row in rows]
+
+def _load_bookings(
+    db: sqlite3.Connection, request: Request, scope: str, query: str, params: tuple
+) -> tuple[list[sqlite3.Row] | None, str]:
+    etag = make_etag(scope, data_version(db, scope), str(request.url.query))
+    if matches(request, etag):
+        return None, etag
+    return db.execute(query, params).fetchall(), etag
+
+
+@router.get("/export")
+async def export_bookings(
+    format: str = Query(default="ndjson"),
+    status: str | None = Query(default=None),
+    date_from: datetime | None = Query(default=None, alias="from"),
+    date_to: datetime | None = Query(default=None, alias="to"),
+    identity: Identity = Depends(get_identity),
+) -> StreamingResponse:
+    """Stream every visible booking, newest first; ``from`` is inclusive and ``to`` exclusive."""
+    if identity.role is UserRole.owner:
+        query = (
+            "SELECT b.id,b.drone_id,b.farmer_name,b.farmer_mobile,b.booking_date,b.duration_hrs,b.status,b.starts_at,b.ends_at "
+            "FROM bookings b JOIN drones d ON b.drone_id = d.id WHERE d.owner_id=?"
+        )
+        params: list = [identity.profile_id]
+    else:
+        query = (
+            "SELECT b.id,b.drone_id,b.farmer_name,b.farmer_mobile,b.booking_date,b.duration_hrs,b.status,b.starts_at,b.ends_at "
+            "FROM bookings b WHERE b.farmer_mobile=?"
+        )
+        params = [identity.mobile]
+    if status:
+        query += " AND b.status=?"
+        params.append(status)
+    if date_from is not None:
+        query += " AND b.booking_date >= ?"
+        params.append(iso_bound(date_from))
+    if date_to is not None:
+        query += " AND b.booking_date < ?"
+        params.append(iso_bound(date_to))
+    query += " ORDER BY b.booking_date DESC, b.id DESC"
+    return stream_query(query, tuple(params), format, "bookings", BOOKING_TIMESTAMPS)
 
 
 @router.post("/", response_model=BookingOut)
-def create_booking(
-    payload: BookingCreate,
-    identity: Identity = Depends(require_farmer),
-    db: sqlite3.Connection = Depends(get_db),
-) -> BookingOut:
-    drone = db.execute("SELECT id FROM drones WHERE id=?", (payload.drone_id,)).fetchone()
+async def create_booking(payload: BookingCreate, identity: Identity = Depends(require_farmer)) -> BookingOut:
+    booking, owner_id = await run_write(_insert_booking, payload, identity)
+    await get_hub().publish(
+        booking_channels(owner_id, booking.farmer_mobile), "booking.created", booking.model_dump(mode="json")
+    )
+    return booking
+
+
+def _insert_booking(db: sqlite3.Connection, payload: BookingCreate, identity: Identity) -> tuple[BookingOut, int]:
+    now = datetime.utcnow()
+    starts_at, ends_at = slot_bounds(payload.starts_at or now, payload.duration_hrs)
+    # Runs on the writer, which holds the write lock: the overlap check and
+    # the insert cannot interleave with another booking.
+    drone = db.execute("SELECT owner_id FROM drones WHERE id=?", (payload.drone_id,)).fetchone()
     if not drone:
         raise HTTPException(status_code=404, detail="Drone not found")
-    farmer = db.execute("SELECT name FROM farmers WHERE mobile=?", (identity.mobile,)).fetchone()
-    if not farmer:
-        raise HTTPException(status_code=404, detail="Farmer not found")
-    now = datetime.utcnow().isoformat()
-    farmer_name = payload.farmer_name or farmer["name"]
-    db.execute(
-        "INSERT INTO bookings(drone_id,farmer_name,farmer_mobile,booking_date,duration_hrs,status) "
-        "VALUES(?,?,?,?,?, 'Pending')",
+    farmer_name = payload.farmer_name
+    if not farmer_name:
+        farmer = db.execute("SELECT name FROM farmers WHERE id=?", (identity.profile_id,)).fetchone()
+        if not farmer:
+            raise HTTPException(status_code=404, detail="Farmer not found")
+        farmer_name = farmer["name"]
+    if _slot_taken(db, payload.drone_id, starts_at, ends_at):
+        raise HTTPException(status_code=409, detail="Drone is already booked for an overlapping slot")
+    cursor = db.execute(
+        "INSERT INTO bookings(drone_id,farmer_name,farmer_mobile,booking_date,duration_hrs,status,starts_at,ends_at) "
+        "VALUES(?,?,?,?,?, 'Pending',?,?)",
         (
             payload.drone_id,
             farmer_name,
             identity.mobile,
-            now,
+            now.isoformat(),
             payload.duration_hrs,
+            starts_at,
+            ends_at,
         ),
     )
-    db.commit()
-    new_id = db.execute("SELECT last_insert_rowid()").fetchone()[0]
     row = db.execute(
-        "SELECT id,drone_id,farmer_name,farmer_mobile,booking_date,duration_hrs,status FROM bookings WHERE id=?",
-        (new_id,),
+        "SELECT id,drone_id,farmer_name,farmer_mobile,booking_date,duration_hrs,status,starts_at,ends_at "
+        "FROM bookings WHERE id=?",
+        (cursor.lastrowid,),
     ).fetchone()
-    return BookingOut(**dict(row))
+    return BookingOut(**dict(row)), drone["owner_id"]
+
+
+def _slot_taken(db: sqlite3.Connection, drone_id: int, starts_at: str, ends_at: str, exclude: int | None = None) -> bool:
+    params = (drone_id, drone_id, *overlap_params(datetime.fromisoformat(starts_at), datetime.fromisoformat(ends_at)))
+    if exclude is not None:
+        params += (exclude,)
+    return bool(db.execute(f"SELECT {overlap_clause('?', '?' if exclude is not None else None)}", params).fetchone()[0])
+
+
+@router.patch("/batch", response_model=List[BookingBatchResult])
+async def update_bookings(payload: BookingBatchUpdate, identity: Identity = Depends(require_owner)) -> List[BookingBatchResult]:
+    """Set the status of many bookings in one transaction.
+
+    The batch is rejected as a whole (400) for an invalid status or a
+    repeated id. Otherwise each item gets the status code
+    ``PATCH /bookings/{id}`` would have returned for it, and only the 200s
+    are applied.
+    """
+    ids = [item.id for item in payload.bookings]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Each booking may appear only once")
+    for item in payload.bookings:
+        if item.status not in BOOKING_STATUSES:
+            raise HTTPException(status_code=400, detail="status must be Pending/Accepted/Rejected")
+    results, changes = await run_write(_set_booking_statuses, payload.bookings, identity.profile_id)
+    catalog = get_catalog()
+    for drone_id in {drone_id for _, drone_id, _, _ in changes}:
+        catalog.drone_changed(drone_id)
+    await get_hub().publish_all(
+        message
+        for booking_id, drone_id, farmer_mobile, status in changes
+        for message in _status_events(identity.profile_id, booking_id, drone_id, farmer_mobile, status)
+    )
+    return results
+
+
+def _set_booking_statuses(
+    db: sqlite3.Connection, items: List[BookingStatusItem], owner_id: int
+) -> tuple[List[BookingBatchResult], list[tuple[int, int, str | None, str]]]:
+    placeholders = ",".join("?" for _ in items)
+    # One query settles existence and ownership for the whole batch. LEFT
+    # JOIN so a booking whose drone row is gone is told apart (drone_row NULL).
+    found = {
+        row["id"]: row
+        for row in db.execute(
+            "SELECT b.id,b.drone_id,b.farmer_mobile,b.status,b.starts_at,b.ends_at,d.id AS drone_row,d.owner_id "
+            f"FROM bookings b LEFT JOIN drones d ON d.id = b.drone_id WHERE b.id IN ({placeholders})",
+            tuple(item.id for item in items),
+        ).fetchall()
+    }
+    results: dict[int, BookingBatchResult] = {}
+    updates: list[tuple[str, int]] = []
+    reactivations: list[tuple[BookingStatusItem, sqlite3.Row]] = []
+    for item in items:
+        booking = found.get(item.id)
+        if booking is None:
+            results[item.id] = BookingBatchResult(id=item.id, status_code=404, detail="Booking not found")
+        elif booking["drone_row"] is None:
+            results[item.id] = BookingBatchResult(id=item.id, status_code=404, detail="Drone not found")
+        elif booking["owner_id"] != owner_id:
+            results[item.id] = BookingBatchResult(
+                id=item.id, status_code=403, detail="Cannot update another owner's booking"
+            )
+        else:
+            results[item.id] = BookingBatchResult(id=item.id, status_code=200, status=item.status)
+            if (
+                item.status in ACTIVE_BOOKING_STATUSES
+                and booking["status"] not in ACTIVE_BOOKING_STATUSES
+                and booking["starts_at"] is not None
+            ):
+                reactivations.append((item, booking))
+            else:
+                updates.append((item.status, item.id))
+
+    # Releasing slots first lets a reactivation later in the batch take one.
+    db.executemany("UPDATE bookings SET status=? WHERE id=?", updates)
+    for item, booking in reactivations:
+        if _slot_taken(db, booking["drone_id"], booking["starts_at"], booking["ends_at"], exclude=item.id):
+            results[item.id] = BookingBatchResult(
+                id=item.id, status_code=409, detail="Drone is already booked for an overlapping slot"
+            )
+        else:
+            db.execute("UPDATE bookings SET status=? WHERE id=?", (item.status, item.id))
+
+    # (booking id, drone id, farmer mobile, new status) for each applied item, in request order.
+    changes = [
+        (item.id, found[item.id]["drone_id"], found[item.id]["farmer_mobile"], item.status)
+        for item in items
+        if results[item.id].status_code == 200
+    ]
+    # As for single updates, a drone's status follows its latest-updated booking.
+    drone_status = {drone_id: _drone_status(status) for _, drone_id, _, status in changes}
+    db.executemany(
+        "UPDATE drones SET status=? WHERE id=?", [(status, drone_id) for drone_id, status in drone_status.items()]
+    )
+    return list(results.values()), changes
 
 
 @router.patch("/{booking_id}")
-def update_booking(
+async def update_booking(
     booking_id: int,
     payload: BookingStatusUpdate,
     identity: Identity = Depends(require_owner),
-    db: sqlite3.Connection = Depends(get_db),
 ) -> dict:
-    if payload.status not in {"Pending", "Accepted", "Rejected"}:
+    if payload.status not in BOOKING_STATUSES:
         raise HTTPException(status_code=400, detail="status must be Pending/Accepted/Rejected")
-    owner = db.execute("SELECT id FROM owners WHERE mobile=?", (identity.mobile,)).fetchone()
-    if not owner:
-        raise HTTPException(status_code=404, detail="Owner not found")
+    drone_id, farmer_mobile = await run_write(_set_booking_status, booking_id, payload.status, identity.profile_id)
+    get_catalog().drone_changed(drone_id)
+    await get_hub().publish_all(
+        _status_events(identity.profile_id, booking_id, drone_id, farmer_mobile, payload.status)
+    )
+    return {"message": f"Booking {payload.status}"}
+
+
+def _status_events(
+    owner_id: int, booking_id: int, drone_id: int, farmer_mobile: str | None, status: str
+) -> list[tuple[list[str], str, dict]]:
+    return [
+        (
+            booking_channels(owner_id, farmer_mobile),
+            "booking.updated",
+            {"id": booking_id, "drone_id": drone_id, "status": status},
+        ),
+        ([owner_channel(owner_id)], "drone.updated", {"id": drone_id, "status": _drone_status(status)}),
+    ]
+
+
+def _drone_status(booking_status: str) -> str:
+    return "Booked" if booking_status == "Accepted" else "Available"
+
+
+def _set_booking_status(
+    db: sqlite3.Connection, booking_id: int, status: str, owner_id: int
+) -> tuple[int, str | None]:
     booking = db.execute(
-        "SELECT drone_id FROM bookings WHERE id=?",
+        "SELECT drone_id,farmer_mobile,status,starts_at,ends_at FROM bookings WHERE id=?",
         (booking_id,),
     ).fetchone()
     if not booking:
@@ -102,19 +319,16 @@ def update_booking(
     drone = db.execute("SELECT owner_id FROM drones WHERE id=?", (booking["drone_id"],)).fetchone()
     if not drone:
         raise HTTPException(status_code=404, detail="Drone not found")
-    if drone["owner_id"] != owner["id"]:
+    if drone["owner_id"] != owner_id:
         raise HTTPException(status_code=403, detail="Cannot update another owner's booking")
+    if (
+        status in ACTIVE_BOOKING_STATUSES
+        and booking["status"] not in ACTIVE_BOOKING_STATUSES
+        and booking["starts_at"] is not None
+        and _slot_taken(db, booking["drone_id"], booking["starts_at"], booking["ends_at"], exclude=booking_id)
+    ):
+        raise HTTPException(status_code=409, detail="Drone is already booked for an overlapping slot")
 
-    db.execute("UPDATE bookings SET status=? WHERE id=?", (payload.status, booking_id))
-    if payload.status == "Accepted":
-        db.execute(
-            "UPDATE drones SET status='Booked' WHERE id=?",
-            (booking["drone_id"],),
-        )
-    elif payload.status in {"Pending", "Rejected"}:
-        db.execute(
-            "UPDATE drones SET status='Available' WHERE id=?",
-            (booking["drone_id"],),
-        )
-    db.commit()
-    return {"message": f"Booking {payload.status}"}
+    db.execute("UPDATE bookings SET status=? WHERE id=?", (status, booking_id))
+    db.execute("UPDATE drones SET status=? WHERE id=?", (_drone_status(status), booking["drone_id"]))
+    return booking["drone_id"], booking["farmer_mobile"]
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+import math
 import sqlite3
 from collections import defaultdict
-from typing import List
+from datetime import datetime
+from typing import Callable, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
-from ..dependencies import Identity, get_db, require_owner
-from ..models import AvailabilityUpdate, DroneCreate, DroneOut
-from ..utils import haversine_km
+from ..cache import CatalogCache, get_catalog
+from ..db import run_db, run_write
+from ..dependencies import Identity, require_owner
+from ..events import get_hub, owner_channel
+from ..models import AvailabilityUpdate, DroneBatchCreate, DroneCreate, DroneOut
+from ..pagination import MAX_PAGE_SIZE, decode_cursor, set_next_cursor, split_page
+from ..serialization import RowSerializer, json_response
+from ..slots import overlap_clause, overlap_params, slot_time
+from ..utils import EARTH_RADIUS_KM, bounding_box, haversine_km_batch
+from ..versions import data_version, make_etag, matches, not_modified, set_etag
 
 
 DRONE_IMAGE_POOL = (
@@ -17,48 +26,161 @@ DRONE_IMAGE_POOL = (
     "https://lh3.googleusercontent.com/aida-public/AB6AXuAmpV08bzFkSosB8mv2e8SgWObi7jdK2vPsg4xOd0rnpB5iQKwBMT2nhKmmJzADOFATT-94zILucmYeMRczuMhZqxr9fG4pZ4_zBP3jyEwTf7E6QeyD5aOW52TrpQwfhpBT-UJgZd3f5DhQJRUSsnv29DxSNtudUMMiHABADHu5W3N_2WeaGa4OIpG_mDysO_QKDcshJtmSSNQz2-2plPA0x2QzpOIhZlsv_TrNJjdlvtSXxvpc1VbspB-aA_oURxGIIbHj1OS8oS1j",
 )
 
+_DRONE_COLUMNS = (
+    "d.id,d.name,d.type,d.lat,d.lon,d.status,d.price_per_hr,d.image_url,d.battery_mah,d.capacity_liters,d.owner_id"
+)
+
+DRONE_ROWS = RowSerializer(DroneOut)
+
+# Nearest-first pages search outwards from this radius past the cursor,
+# doubling it; MAX_SEARCH_KM (half the Earth's circumference) covers everything.
+FIRST_RING_KM = 1.0
+MAX_SEARCH_KM = math.pi * EARTH_RADIUS_KM
+
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[DroneOut])
-def list_drones(
+async def list_drones(
+    request: Request,
     lat: float | None = Query(default=None),
     lon: float | None = Query(default=None),
     max_dist_km: float | None = Query(default=None),
     min_price: float | None = Query(default=None),
     max_price: float | None = Query(default=None),
+    drone_type: str | None = Query(default=None, alias="type"),
+    status: str | None = Query(default=None),
+    min_battery_mah: float | None = Query(default=None),
+    min_capacity_liters: float | None = Query(default=None),
     sort_by: str | None = Query(default=None),
-    db: sqlite3.Connection = Depends(get_db),
-) -> List[DroneOut]:
-    rows = db.execute(
-        "SELECT id,name,type,lat,lon,status,price_per_hr,image_url,battery_mah,capacity_liters,owner_id FROM drones"
-    ).fetchall()
-    id_list = [row["id"] for row in rows]
-    image_map = _fetch_drone_images(db, id_list)
-    drones = [DroneOut(**dict(row), image_urls=image_map.get(row["id"])) for row in rows]
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
+) -> Response:
+    # Served from the catalog cache when possible; SQLite is only touched on a
+    # miss, and a matching If-None-Match is answered before the listing query.
+    catalog = await _revalidated_catalog()
+    key = (
+        "list", lat, lon, max_dist_km, min_price, max_price, drone_type, status,
+        min_battery_mah, min_capacity_liters, sort_by, limit, cursor,
+    )
+    cached = catalog.get(key)
+    if cached is None:
+        generation = catalog.generation
+        listing, etag = await run_db(
+            _load_drones,
+            request,
+            lat=lat,
+            lon=lon,
+            max_dist_km=max_dist_km,
+            min_price=min_price,
+            max_price=max_price,
+            drone_type=drone_type,
+            status=status,
+            min_battery_mah=min_battery_mah,
+            min_capacity_liters=min_capacity_liters,
+            sort_by=sort_by,
+            limit=limit,
+            cursor=cursor,
+        )
+        if listing is None:
+            return not_modified(etag)
+        body, count, next_cursor = listing
+        cached = (body, next_cursor, etag)
+        catalog.put(key, cached, weight=count, generation=generation)
+    body, next_cursor, etag = cached
+    if matches(request, etag):
+        return not_modified(etag)
+    response = json_response(body)
+    set_etag(response, etag)
+    set_next_cursor(response, next_cursor)
+    return response
 
-    if min_price is not None:
-        drones = [d for d in drones if d.price_per_hr >= min_price]
-    if max_price is not None:
-        drones = [d for d in drones if d.price_per_hr <= max_price]
-    if lat is not None and lon is not None and max_dist_km is not None:
-        drones = [
-            d
-            for d in drones
-            if haversine_km(lat, lon, d.lat, d.lon) <= max_dist_km
-        ]
 
-    if sort_by == "price":
-        drones.sort(key=lambda d: d.price_per_hr)
-    elif sort_by == "distance" and lat is not None and lon is not None:
-        drones.sort(key=lambda d: haversine_km(lat, lon, d.lat, d.lon))
+@router.get("/available", response_model=List[DroneOut])
+async def list_available_drones(
+    lat: float = Query(),
+    lon: float = Query(),
+    start: datetime = Query(),
+    end: datetime = Query(),
+    max_dist_km: float = Query(default=25.0, gt=0),
+    drone_type: str | None = Query(default=None, alias="type"),
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
+) -> Response:
+    """Drones within ``max_dist_km`` of a point with no booking overlapping ``[start, end)``.
 
-    return drones
+    Nearest first. Drones under maintenance are left out. Not cached, since
+    a booking for any drone can change the answer.
+    """
+    starts, ends = slot_time(start), slot_time(end)
+    if ends <= starts:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    body, _, next_cursor = await run_db(
+        _query_drones,
+        lat=lat,
+        lon=lon,
+        max_dist_km=max_dist_km,
+        min_price=None,
+        max_price=None,
+        drone_type=drone_type,
+        status=None,
+        min_battery_mah=None,
+        min_capacity_liters=None,
+        sort_by="distance",
+        limit=limit,
+        cursor=cursor,
+        free_between=(starts, ends),
+    )
+    response = json_response(body)
+    set_next_cursor(response, next_cursor)
+    return response
 
 
 @router.get("/{drone_id}", response_model=DroneOut)
-def get_drone(drone_id: int, db: sqlite3.Connection = Depends(get_db)) -> DroneOut:
+async def get_drone(drone_id: int, request: Request, response: Response) -> DroneOut:
+    catalog = await _revalidated_catalog()
+    cached = catalog.get(("drone", drone_id))
+    if cached is None:
+        generation = catalog.generation
+        drone, etag = await run_db(_load_drone, request, drone_id)
+        if drone is None:
+            return not_modified(etag)
+        cached = (drone, etag)
+        catalog.put(("drone", drone_id), cached, weight=1, generation=generation)
+    drone, etag = cached
+    if matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return drone
+
+
+async def _revalidated_catalog() -> CatalogCache:
+    # Other worker processes write the same database; re-read the shared
+    # version now and then so their changes evict what this process cached.
+    catalog = get_catalog()
+    if catalog.claim_revalidation():
+        catalog.observe_version(await run_db(data_version, "drones"))
+    return catalog
+
+
+def _load_drones(db: sqlite3.Connection, request: Request, **filters) -> tuple[tuple[bytes, int, str | None] | None, str]:
+    # Version before rows: a racing write can only leave the ETag older
+    # than the body (a wasted refetch), never newer (a missed update).
+    etag = make_etag("drones", data_version(db, "drones"), str(request.url.query))
+    if matches(request, etag):
+        return None, etag
+    return _query_drones(db, **filters), etag
+
+
+def _load_drone(db: sqlite3.Connection, request: Request, drone_id: int) -> tuple[DroneOut | None, str]:
+    etag = make_etag("drones", data_version(db, "drones"), str(drone_id))
+    if matches(request, etag):
+        return None, etag
+    return _fetch_drone(db, drone_id), etag
+
+
+def _fetch_drone(db: sqlite3.Connection, drone_id: int) -> DroneOut:
     row = db.execute(
         "SELECT id,name,type,lat,lon,status,price_per_hr,image_url,battery_mah,capacity_liters,owner_id FROM drones WHERE id=?",
         (drone_id,),
@@ -70,71 +192,314 @@ def get_drone(drone_id: int, db: sqlite3.Connection = Depends(get_db)) -> DroneO
 
 
 @router.post("/", response_model=DroneOut)
-def create_drone(
-    payload: DroneCreate,
-    identity: Identity = Depends(require_owner),
-    db: sqlite3.Connection = Depends(get_db),
-) -> DroneOut:
-    owner = db.execute("SELECT id FROM owners WHERE mobile=?", (identity.mobile,)).fetchone()
-    if not owner:
-        raise HTTPException(status_code=404, detail="Owner not found")
+async def create_drone(payload: DroneCreate, identity: Identity = Depends(require_owner)) -> DroneOut:
+    drones = await run_write(_insert_drones, [payload], identity.profile_id)
+    get_catalog().drone_changed(drones[0].id)
+    await _publish_created(identity.profile_id, drones)
+    return drones[0]
 
-    primary_image = payload.image_url or (payload.image_urls[0] if payload.image_urls else None) or _default_image(db)
 
-    db.execute(
-        "INSERT INTO drones(name,type,lat,lon,price_per_hr,image_url,battery_mah,capacity_liters,owner_id) VALUES(?,?,?,?,?,?,?,?,?)",
-        (
-            payload.name,
-            payload.type,
-            float(payload.lat),
-            float(payload.lon),
-            float(payload.price_per_hr),
-            primary_image,
-            payload.battery_mah,
-            payload.capacity_liters,
-            int(owner["id"]),
-        ),
+@router.post("/batch", response_model=List[DroneOut])
+async def create_drones(payload: DroneBatchCreate, identity: Identity = Depends(require_owner)) -> List[DroneOut]:
+    """Register up to ``MAX_BATCH_SIZE`` drones at once; all are created or none.
+
+    The created drones come back in request order.
+    """
+    drones = await run_write(_insert_drones, payload.drones, identity.profile_id)
+    catalog = get_catalog()
+    for drone in drones:
+        catalog.drone_changed(drone.id)
+    await _publish_created(identity.profile_id, drones)
+    return drones
+
+
+async def _publish_created(owner_id: int, drones: List[DroneOut]) -> None:
+    await get_hub().publish_all(
+        ([owner_channel(owner_id)], "drone.created", drone.model_dump(mode="json", exclude_none=True))
+        for drone in drones
     )
-    db.commit()
-    new_id = db.execute("SELECT last_insert_rowid()").fetchone()[0]
 
-    if payload.image_urls:
-        _insert_drone_images(db, new_id, payload.image_urls)
-        db.commit()
 
-    row = db.execute(
-        "SELECT id,name,type,lat,lon,status,price_per_hr,image_url,battery_mah,capacity_liters,owner_id FROM drones WHERE id=?",
-        (new_id,),
-    ).fetchone()
-    image_map = _fetch_drone_images(db, [new_id])
-    return DroneOut(**dict(row), image_urls=image_map.get(new_id))
+def _insert_drones(db: sqlite3.Connection, payloads: List[DroneCreate], owner_id: int) -> List[DroneOut]:
+    # Runs on the writer, inside its transaction. AUTOINCREMENT hands out
+    # increasing ids and the writer holds the write lock, so the new rows
+    # are the last len(payloads) ids up to last_insert_rowid().
+    image_count = db.execute("SELECT COUNT(*) FROM drones").fetchone()[0]
+    rows = []
+    for index, payload in enumerate(payloads):
+        primary_image = (
+            payload.image_url
+            or (payload.image_urls[0] if payload.image_urls else None)
+            or DRONE_IMAGE_POOL[(image_count + index) % len(DRONE_IMAGE_POOL)]
+        )
+        rows.append(
+            (
+                payload.name,
+                payload.type,
+                float(payload.lat),
+                float(payload.lon),
+                float(payload.price_per_hr),
+                primary_image,
+                payload.battery_mah,
+                payload.capacity_liters,
+                owner_id,
+            )
+        )
+    db.executemany(
+        "INSERT INTO drones(name,type,lat,lon,price_per_hr,image_url,battery_mah,capacity_liters,owner_id) VALUES(?,?,?,?,?,?,?,?,?)",
+        rows,
+    )
+    last_id = db.execute("SELECT last_insert_rowid()").fetchone()[0]
+    new_ids = list(range(last_id - len(payloads) + 1, last_id + 1))
+    db.executemany(
+        "INSERT INTO drone_images(drone_id,url) VALUES(?,?)",
+        [
+            (drone_id, url)
+            for drone_id, payload in zip(new_ids, payloads)
+            for url in _trim_image_urls(payload.image_urls or [])
+        ],
+    )
+
+    rows = db.execute(
+        f"SELECT {_DRONE_COLUMNS} FROM drones d WHERE d.id BETWEEN ? AND ? ORDER BY d.id",
+        (new_ids[0], last_id),
+    ).fetchall()
+    image_map = _fetch_drone_images(db, new_ids)
+    return [DroneOut(**dict(row), image_urls=image_map.get(row["id"])) for row in rows]
 
 
 @router.patch("/{drone_id}/availability")
-def update_availability(
+async def update_availability(
     drone_id: int,
     payload: AvailabilityUpdate,
     identity: Identity = Depends(require_owner),
-    db: sqlite3.Connection = Depends(get_db),
 ) -> dict:
     if not payload.status:
         raise HTTPException(status_code=400, detail="status required")
-    owner = db.execute("SELECT id FROM owners WHERE mobile=?", (identity.mobile,)).fetchone()
-    if not owner:
-        raise HTTPException(status_code=404, detail="Owner not found")
+    await run_write(_set_drone_status, drone_id, payload.status, identity.profile_id)
+    get_catalog().drone_changed(drone_id)
+    await get_hub().publish(
+        [owner_channel(identity.profile_id)], "drone.updated", {"id": drone_id, "status": payload.status}
+    )
+    return {"message": "Availability updated", "status": payload.status}
+
+
+def _set_drone_status(db: sqlite3.Connection, drone_id: int, status: str, owner_id: int) -> None:
     row = db.execute("SELECT owner_id FROM drones WHERE id=?", (drone_id,)).fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="Drone not found")
-    if row["owner_id"] != owner["id"]:
+    if row["owner_id"] != owner_id:
         raise HTTPException(status_code=403, detail="Cannot modify another owner's drone")
-    db.execute("UPDATE drones SET status=? WHERE id=?", (payload.status, drone_id))
-    db.commit()
-    return {"message": "Availability updated", "status": payload.status}
+    db.execute("UPDATE drones SET status=? WHERE id=?", (status, drone_id))
+
+
+def _query_drones(
+    db: sqlite3.Connection,
+    *,
+    lat: float | None,
+    lon: float | None,
+    max_dist_km: float | None,
+    min_price: float | None,
+    max_price: float | None,
+    drone_type: str | None,
+    status: str | None,
+    min_battery_mah: float | None,
+    min_capacity_liters: float | None,
+    sort_by: str | None,
+    limit: int | None,
+    cursor: str | None,
+    free_between: tuple[datetime, datetime] | None = None,
+) -> tuple[bytes, int, str | None]:
+    has_origin = lat is not None and lon is not None
+    if sort_by == "price":
+        order = "price"
+    elif sort_by == "distance" and has_origin:
+        order = "distance"
+    else:
+        order = "id"
+    after = decode_cursor(cursor, 1 if order == "id" else 2)
+    filters = {
+        "min_price": min_price,
+        "max_price": max_price,
+        "drone_type": drone_type,
+        "status": status,
+        "min_battery_mah": min_battery_mah,
+        "min_capacity_liters": min_capacity_liters,
+        "free_between": free_between,
+    }
+    if order == "distance" and limit is not None:
+        ranked = _nearest_drones(db, lat, lon, max_dist_km, after, limit, filters)
+    else:
+        ranked = _ranked_drones(db, lat, lon, max_dist_km, order, after, limit, filters)
 
+    ranked, next_cursor = split_page(ranked, limit, _page_key(order))
 
-def _default_image(db: sqlite3.Connection) -> str:
-    count = db.execute("SELECT COUNT(*) FROM drones").fetchone()[0]
-    return DRONE_IMAGE_POOL[count % len(DRONE_IMAGE_POOL)]
+    image_map = _fetch_drone_images(db, [row["id"] for row, _ in ranked])
+    body = DRONE_ROWS.dump(
+        (row for row, _ in ranked),
+        ({"image_urls": image_map.get(row["id"]), "distance_km": dist} for row, dist in ranked),
+    )
+    return body, len(ranked), next_cursor
+
+
+def _ranked_drones(
+    db: sqlite3.Connection,
+    lat: float | None,
+    lon: float | None,
+    max_dist_km: float | None,
+    order: str,
+    after: list | None,
+    limit: int | None,
+    filters: dict,
+) -> list[tuple[sqlite3.Row, float | None]]:
+    has_origin = lat is not None and lon is not None
+    bbox = bounding_box(lat, lon, max_dist_km) if has_origin and max_dist_km is not None else None
+    # Radius and distance results are trimmed after haversine, so only plain
+    # SQL-ordered listings can stop at the page boundary inside the query.
+    sql_limit = limit + 1 if limit is not None and bbox is None and order != "distance" else None
+    query, params = _build_drone_query(
+        bbox=bbox,
+        order=order,
+        after=None if order == "distance" else after,
+        limit=sql_limit,
+        **filters,
+    )
+    rows = db.execute(query, params).fetchall()
+
+    # Distances are computed once and reused for filtering, sorting and the response.
+    distances: list[float | None] = [None] * len(rows)
+    if has_origin:
+        distances = haversine_km_batch(lat, lon, [row["lat"] for row in rows], [row["lon"] for row in rows])
+    ranked = list(zip(rows, distances))
+    if bbox is not None:
+        ranked = [(row, dist) for row, dist in ranked if dist <= max_dist_km]
+    if order == "distance":
+        ranked.sort(key=lambda item: (item[1], item[0]["id"]))
+        if after is not None:
+            ranked = [item for item in ranked if (item[1], item[0]["id"]) > tuple(after)]
+    return ranked
+
+
+def _nearest_drones(
+    db: sqlite3.Connection,
+    lat: float,
+    lon: float,
+    max_dist_km: float | None,
+    after: list | None,
+    limit: int,
+    filters: dict,
+) -> list[tuple[sqlite3.Row, float]]:
+    """Up to ``limit + 1`` drones nearest first, past the ``(distance, id)`` cursor.
+
+    Searches outwards instead of ranking every drone within ``max_dist_km``:
+    each pass reads the R*Tree box for a radius ``step`` beyond the cursor's
+    distance, doubling ``step`` until the radius holds more than a page or
+    reaches ``max_dist_km``. The box holds every drone within the radius, so
+    no drone outside it can sort before those found. A page costs about the
+    drones within its farthest row's distance, not every candidate in range.
+    """
+    ceiling = max_dist_km if max_dist_km is not None else MAX_SEARCH_KM
+    start = after[0] if after is not None else 0.0
+    step = FIRST_RING_KM
+    while True:
+        radius = min(start + step, ceiling)
+        query, params = _build_drone_query(bbox=bounding_box(lat, lon, radius), order="distance", **filters)
+        rows = db.execute(query, params).fetchall()
+        distances = haversine_km_batch(lat, lon, [row["lat"] for row in rows], [row["lon"] for row in rows])
+        ranked = sorted(
+            (
+                (row, dist)
+                for row, dist in zip(rows, distances)
+                if dist <= radius and (after is None or (dist, row["id"]) > tuple(after))
+            ),
+            key=lambda item: (item[1], item[0]["id"]),
+        )
+        if len(ranked) > limit or radius >= ceiling:
+            return ranked[: limit + 1]
+        step *= 2
+
+
+def _build_drone_query(
+    *,
+    bbox: tuple[float, float, float, float] | None,
+    min_price: float | None,
+    max_price: float | None,
+    drone_type: str | None,
+    status: str | None,
+    min_battery_mah: float | None,
+    min_capacity_liters: float | None,
+    order: str,
+    after: list | None = None,
+    limit: int | None = None,
+    free_between: tuple[datetime, datetime] | None = None,
+) -> tuple[str, tuple]:
+    """Translate list filters into one parameterised query over ``drones d``.
+
+    Radius searches join the R*Tree so only bounding-box candidates are read;
+    ``CROSS JOIN`` keeps it the outer loop even when ``ANALYZE`` statistics
+    would have the planner scan ``drones`` and probe the R*Tree per row.
+    every attribute filter is pushed into ``WHERE`` where the indexes from
+    migration 4 can serve it. ``after`` is a keyset cursor on ``(price, id)``
+    or ``(id,)``; distance ordering and its cursor are left to the caller.
+    ``free_between`` keeps only drones out of maintenance with no active
+    booking slot overlapping that window, probed per drone in the
+    ``booking_slots`` R*Tree.
+    """
+    clauses: list[str] = []
+    params: list = []
+    if bbox is not None:
+        source = "drones_rtree r CROSS JOIN drones d ON d.id = r.id"
+        clauses.append("r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ?")
+        params.extend(bbox)
+    else:
+        source = "drones d"
+    if drone_type is not None:
+        clauses.append("d.type = ?")
+        params.append(drone_type)
+    if status is not None:
+        clauses.append("d.status = ?")
+        params.append(status)
+    if min_price is not None:
+        clauses.append("d.price_per_hr >= ?")
+        params.append(min_price)
+    if max_price is not None:
+        clauses.append("d.price_per_hr <= ?")
+        params.append(max_price)
+    if min_battery_mah is not None:
+        clauses.append("d.battery_mah >= ?")
+        params.append(min_battery_mah)
+    if min_capacity_liters is not None:
+        clauses.append("d.capacity_liters >= ?")
+        params.append(min_capacity_liters)
+    if free_between is not None:
+        clauses.append(f"d.status != 'Maintenance' AND NOT {overlap_clause('d.id')}")
+        params.extend(overlap_params(*free_between))
+    if after is not None and order == "price":
+        clauses.append("(d.price_per_hr, d.id) > (?, ?)")
+        params.extend(after)
+    elif after is not None and order == "id":
+        clauses.append("d.id > ?")
+        params.extend(after)
+
+    query = f"SELECT {_DRONE_COLUMNS} FROM {source}"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    if order == "price":
+        query += " ORDER BY d.price_per_hr, d.id"
+    elif order == "id" and (after is not None or limit is not None):
+        query += " ORDER BY d.id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return query, tuple(params)
+
+
+def _page_key(order: str) -> Callable[[tuple[sqlite3.Row, float | None]], tuple]:
+    if order == "price":
+        return lambda item: (item[0]["price_per_hr"], item[0]["id"])
+    if order == "distance":
+        return lambda item: (item[1], item[0]["id"])
+    return lambda item: (item[0]["id"],)
 
 
 def _fetch_drone_images(db: sqlite3.Connection, drone_ids: List[int]) -> dict[int, List[str]]:
@@ -152,6 +517,10 @@ def _fetch_drone_images(db: sqlite3.Connection, drone_ids: List[int]) -> dict[in
 
 
 def _insert_drone_images(db: sqlite3.Connection, drone_id: int, urls: List[str]) -> None:
-    trimmed = [url for url in urls if url]
-    for url in trimmed[:3]:
-        db.execute("INSERT INTO drone_images(drone_id,url) VALUES(?,?)", (drone_id, url))
+    db.executemany(
+        "INSERT INTO drone_images(drone_id,url) VALUES(?,?)", [(drone_id, url) for url in _trim_image_urls(urls)]
+    )
+
+
+def _trim_image_urls(urls: List[str]) -> List[str]:
+    return [url for url in urls if url][:3]
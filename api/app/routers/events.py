@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+
+from ..config import get_settings
+from ..dependencies import Identity, get_identity
+from ..events import Event, Subscription, get_hub, identity_channel
+
+
+router = APIRouter()
+
+# How long an SSE client waits before reconnecting after the stream ends.
+RETRY_MS = 3000
+
+
+@router.get("/")
+async def stream_events(
+    identity: Identity = Depends(get_identity),
+    last_event_id: str | None = Header(default=None),
+) -> StreamingResponse:
+    """Server-Sent Events for the caller's bookings and drones.
+
+    Events are ``booking.created``, ``booking.updated``, ``drone.created``
+    and ``drone.updated`` with a JSON ``data`` line; a comment line is sent
+    every ``events_heartbeat_seconds`` while idle. A client too slow to keep
+    up has its stream ended and resumes with ``Last-Event-ID``.
+    """
+    subscription, replay = get_hub().subscribe(identity_channel(identity), last_event_id)
+    return StreamingResponse(
+        _sse(subscription, replay, get_settings().events_heartbeat_seconds),
+        media_type="text/event-stream",
+        # No caching, and no buffering by a reverse proxy in front of us.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _sse(subscription: Subscription, replay: list[Event], heartbeat: float) -> AsyncIterator[bytes]:
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        for event in replay:
+            yield _sse_frame(event)
+        while True:
+            event = await subscription.next(heartbeat)
+            if subscription.closed:
+                return
+            yield b": ping\n\n" if event is None else _sse_frame(event)
+    finally:
+        subscription.close()
+
+
+def _sse_frame(event: Event) -> bytes:
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (event.id.encode(), event.type.encode(), event.data)
+
+
+@router.websocket("/ws")
+async def websocket_events(
+    websocket: WebSocket,
+    token: str | None = Query(default=None),
+    last_event_id: str | None = Query(default=None),
+) -> None:
+    """The ``GET /events/`` stream as WebSocket text frames.
+
+    Each frame is ``{"id", "event", "data"}``; idle connections get
+    ``{"event": "ping"}``. Browsers cannot set headers on a WebSocket, so
+    the bearer token may also come as ``token``. A client that falls behind
+    is closed with 1013 and resumes with ``last_event_id``.
+    """
+    authorization = websocket.headers.get("authorization") or (f"Bearer {token}" if token else None)
+    try:
+        identity = await get_identity(authorization)
+    except HTTPException as exc:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(exc.detail))
+        return
+    await websocket.accept()
+
+    heartbeat = get_settings().events_heartbeat_seconds
+    subscription, replay = get_hub().subscribe(identity_channel(identity), last_event_id)
+    watcher = asyncio.create_task(_close_on_disconnect(websocket, subscription))
+    try:
+        for event in replay:
+            await websocket.send_text(_ws_frame(event))
+        while True:
+            event = await subscription.next(heartbeat)
+            if subscription.closed:
+                break
+            await websocket.send_text('{"event":"ping"}' if event is None else _ws_frame(event))
+        if not watcher.done():
+            # Cut off by the hub: fell behind, or the server is shutting down.
+            code = status.WS_1013_TRY_AGAIN_LATER if subscription.overflowed else status.WS_1001_GOING_AWAY
+            await websocket.close(code=code)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.close()
+        watcher.cancel()
+
+
+async def _close_on_disconnect(websocket: WebSocket, subscription: Subscription) -> None:
+    # Incoming frames are ignored; reading them is how a disconnect is noticed.
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        subscription.close()
+
+
+def _ws_frame(event: Event) -> str:
+    return f'{{"id":"{event.id}","event":"{event.type}","data":{event.data.decode()}}}'
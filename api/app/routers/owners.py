@@ -3,53 +3,110 @@ from __future__ import annotations
 import sqlite3
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
-from ..dependencies import Identity, get_db, require_owner
+from ..cache import get_catalog
+from ..db import run_db, run_write
+from ..dependencies import Identity, require_owner
+from ..export import stream_query
 from ..models import OwnerOut, DroneOut
-from .drones import _fetch_drone_images, _insert_drone_images
+from ..pagination import MAX_PAGE_SIZE, decode_cursor, set_next_cursor, split_page
+from ..serialization import RowSerializer, json_response
+from ..versions import data_version, make_etag, matches, not_modified, set_etag
+from .drones import DRONE_ROWS, _fetch_drone_images, _insert_drone_images
 
 
+OWNER_ROWS = RowSerializer(OwnerOut)
+
 router = APIRouter()
 
 
 @router.get("/", response_model=List[OwnerOut])
-def list_owners(
+async def list_owners(
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
     _: Identity = Depends(require_owner),
-    db: sqlite3.Connection = Depends(get_db),
-) -> List[OwnerOut]:
-    rows = db.execute("SELECT id,name,mobile,lat,lon FROM owners").fetchall()
-    return [OwnerOut(**dict(row)) for row in rows]
+) -> Response:
+    after = decode_cursor(cursor, 1)
+    query = "SELECT id,name,mobile,lat,lon FROM owners"
+    params: list = []
+    if after is not None:
+        query += " WHERE id > ?"
+        params.extend(after)
+    query += " ORDER BY id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit + 1)
+    rows = await run_db(lambda db: db.execute(query, tuple(params)).fetchall())
+    rows, next_cursor = split_page(rows, limit, lambda row: (row["id"],))
+    response = json_response(OWNER_ROWS.dump(rows))
+    set_next_cursor(response, next_cursor)
+    return response
 
 
 @router.get("/me/drones", response_model=List[DroneOut])
-def list_my_drones(
-    identity: Identity = Depends(require_owner),
-    db: sqlite3.Connection = Depends(get_db),
-) -> List[DroneOut]:
-    owner = db.execute("SELECT id,name,lat,lon FROM owners WHERE mobile=?", (identity.mobile,)).fetchone()
-    if not owner:
-        return []
+async def list_my_drones(request: Request, identity: Identity = Depends(require_owner)) -> Response:
+    loaded = await run_db(_load_my_drones, request, identity.profile_id)
+    if loaded is None:
+        # First visit: give the owner a starter fleet, then read it back.
+        if await run_write(_seed_owner_demo_drones, identity.profile_id):
+            get_catalog().invalidate()
+        loaded = await run_db(_load_my_drones, request, identity.profile_id)
+        if loaded is None:
+            # Wiped again (a reseed) before it could be read back.
+            return json_response(b"[]")
+    body, etag = loaded
+    if body is None:
+        return not_modified(etag, private=True)
+    response = json_response(body)
+    set_etag(response, etag, private=True)
+    return response
+
+
+def _load_my_drones(db: sqlite3.Connection, request: Request, owner_id: int) -> tuple[bytes | None, str] | None:
+    """The owner's fleet and its ETag; None when an existing owner has no drones yet."""
+    scope = f"owner_drones:{owner_id}"
+    etag = make_etag(scope, data_version(db, scope))
+    if matches(request, etag):
+        return None, etag
 
     existing = db.execute(
         "SELECT id,name,type,lat,lon,status,price_per_hr,image_url,battery_mah,capacity_liters,owner_id "
         "FROM drones WHERE owner_id=?",
-        (owner["id"],),
+        (owner_id,),
     ).fetchall()
 
     if not existing:
-        _seed_owner_demo_drones(db, owner)
-        existing = db.execute(
-            "SELECT id,name,type,lat,lon,status,price_per_hr,image_url,battery_mah,capacity_liters,owner_id "
-            "FROM drones WHERE owner_id=?",
-            (owner["id"],),
-        ).fetchall()
+        if db.execute("SELECT 1 FROM owners WHERE id=?", (owner_id,)).fetchone() is None:
+            return b"[]", etag
+        return None
 
     image_map = _fetch_drone_images(db, [row["id"] for row in existing])
-    return [DroneOut(**dict(row), image_urls=image_map.get(row["id"])) for row in existing]
+    return DRONE_ROWS.dump(existing, ({"image_urls": image_map.get(row["id"])} for row in existing)), etag
+
+
+@router.get("/me/drones/export")
+async def export_my_drones(
+    format: str = Query(default="ndjson"),
+    identity: Identity = Depends(require_owner),
+) -> StreamingResponse:
+    """Stream the owner's fleet by id; gallery images are left out of the flat export."""
+    return stream_query(
+        "SELECT id,name,type,lat,lon,status,price_per_hr,image_url,battery_mah,capacity_liters,owner_id "
+        "FROM drones WHERE owner_id=? ORDER BY id",
+        (identity.profile_id,),
+        format,
+        "drones",
+    )
 
 
-def _seed_owner_demo_drones(db: sqlite3.Connection, owner_row: sqlite3.Row) -> None:
+def _seed_owner_demo_drones(db: sqlite3.Connection, owner_id: int) -> bool:
+    # Runs on the writer, which holds the write lock: re-checking here means
+    # concurrent first visits seed the fleet once. True if drones were added.
+    owner_row = db.execute("SELECT id,lat,lon FROM owners WHERE id=?", (owner_id,)).fetchone()
+    if owner_row is None or db.execute("SELECT 1 FROM drones WHERE owner_id=? LIMIT 1", (owner_id,)).fetchone():
+        return False
     templates = [
         {
             "name": "AgriTek ProFlyer X",
@@ -105,4 +162,4 @@ def _seed_owner_demo_drones(db: sqlite3.Connection, owner_row: sqlite3.Row) -> N
         )
         new_id = cursor.lastrowid
         _insert_drone_images(db, new_id, [template["image"]])
-    db.commit()
+    return True
@@ -7,8 +7,6 @@ import json
 import time
 from datetime import datetime, timedelta
 
-from fastapi import HTTPException, status
-
 from .config import get_settings
 
 
@@ -37,18 +35,26 @@ def jwt_decode(token: str) -> dict:
     settings = get_settings()
     parts = token.split(".")
     if len(parts) != 3:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        raise _unauthorized("Invalid token")
     signing_input = f"{parts[0]}.{parts[1]}".encode()
     sig = _b64url_decode(parts[2])
     expected = hmac.new(settings.secret_key.encode(), signing_input, hashlib.sha256).digest()
     if not hmac.compare_digest(sig, expected):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid signature")
+        raise _unauthorized("Invalid signature")
     payload = json.loads(_b64url_decode(parts[1]))
     if "exp" in payload and int(payload["exp"]) < int(time.time()):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
+        raise _unauthorized("Token expired")
     return payload
 
 
+def _unauthorized(detail: str) -> Exception:
+    # FastAPI is imported only on the failure path, so CLI paths that sign and
+    # check tokens (selftest, bench) do not pay for loading the web stack.
+    from fastapi import HTTPException, status
+
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+
 def generate_token(subject: str, role: str) -> str:
     settings = get_settings()
     expiry = datetime.utcnow() + timedelta(minutes=settings.token_expire_minutes)
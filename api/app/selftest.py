@@ -1,11 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import math
 from datetime import datetime, timedelta
 
+from .cache import CatalogCache, IdentityCache
 from .config import get_settings
-from .db import db_connect, init_db, seed_demo_data, truncate_tables
+from .db import get_pool, init_db, run_db, run_write, seed_demo_data, truncate_tables
+from .events import RESET, EventHub, farmer_channel, owner_channel
+from .identity import Identity
+from .metrics import MetricsRegistry
+from .migrations import LATEST_VERSION, assert_indexed_plans, current_version
+from .models import BookingOut, UserRole
 from .security import generate_token, jwt_decode
-from .utils import haversine_km
+from .serialization import RowSerializer
+from .slots import overlap_params, slot_bounds
+from .static import accepts_gzip
+from .tracing import tracked_queries
+from .utils import EARTH_RADIUS_KM, bounding_box, haversine_km
 
 
 def run_selftest() -> dict[str, str]:
@@ -17,11 +29,115 @@ def run_selftest() -> dict[str, str]:
     assert payload["sub"] == "7000000000"
     assert payload["role"] == "owner"
 
+    identities = IdentityCache(max_entries=1, ttl_seconds=60)
+    identities.put(token, Identity(mobile="7000000000", role=UserRole.owner, profile_id=1), payload["exp"])
+    assert identities.get(token).profile_id == 1
+    identities.invalidate_mobile("7000000000")
+    assert identities.get(token) is None
+
     assert round(haversine_km(0, 0, 0, 0), 6) == 0.0
+    min_lat, max_lat, min_lon, max_lon = bounding_box(25.6, 85.1, 5.0)
+    assert haversine_km(25.6, 85.1, max_lat, 85.1) >= 5.0 - 1e-6
+    assert haversine_km(25.6, 85.1, 25.6, max_lon) >= 5.0 - 1e-6
+    # A point just inside the radius at its eastmost extent, which lies
+    # poleward of the centre's latitude, must still fall inside the box.
+    angular = 0.999 * 500.0 / EARTH_RADIUS_KM
+    edge_lat = math.degrees(math.asin(math.sin(math.radians(60.0)) / math.cos(angular)))
+    edge_lon = 10.0 + math.degrees(math.asin(math.sin(angular) / math.cos(math.radians(60.0))))
+    min_lat, max_lat, min_lon, max_lon = bounding_box(60.0, 10.0, 500.0)
+    assert haversine_km(60.0, 10.0, edge_lat, edge_lon) < 500.0
+    assert min_lat <= edge_lat <= max_lat and min_lon <= edge_lon <= max_lon
+
+    starts_at, ends_at = slot_bounds(datetime.fromisoformat("2030-01-01T14:30:00.5+05:30"), 3)
+    assert (starts_at, ends_at) == ("2030-01-01T09:00:00", "2030-01-01T12:00:00")
+    # Minutes round outwards so the index never misses a partial-minute overlap.
+    assert overlap_params(datetime(2030, 1, 1, 9, 0, 30), datetime(2030, 1, 1, 9, 1, 30))[:2] == (
+        31_558_142,
+        31_558_140,
+    )
+
+    # Rows in every stored timestamp form serialise as BookingOut would.
+    booking_rows = [
+        {
+            "id": 1, "drone_id": 1, "farmer_name": "Farmer", "farmer_mobile": "7100000000",
+            "booking_date": "2025-10-20T09:30:00Z", "duration_hrs": 2, "status": "Accepted",
+            "starts_at": "2025-10-20T09:30:00", "ends_at": "2025-10-20T11:30:00",
+        },
+        {
+            "id": 2, "drone_id": 1, "farmer_name": "Farmer", "farmer_mobile": None,
+            "booking_date": "2026-10-17T08:15:42.123456", "duration_hrs": 1, "status": "Pending",
+            "starts_at": None, "ends_at": None,
+        },
+    ]
+    serialised = RowSerializer(BookingOut).dump(booking_rows)
+    validated = (BookingOut.model_validate(row).model_dump_json().encode() for row in booking_rows)
+    assert serialised == b"[" + b",".join(validated) + b"]"
+    assert b'"booking_date":"2025-10-20T09:30:00.000Z"' in serialised
+    assert b'"booking_date":"2026-10-17T08:15:42.123Z"' in serialised
+
+    assert accepts_gzip("br, gzip;q=0.5") and accepts_gzip("*")
+    assert not accepts_gzip("gzip;q=0") and not accepts_gzip("identity")
+
+    registry = MetricsRegistry()
+    registry.observe("GET", "/drones/{drone_id}", 200, 0.003)
+    registry.observe("GET", "/drones/{drone_id}", 404, 20.0)
+    exposition = registry.render()
+    assert 'http_requests_total{method="GET",route="/drones/{drone_id}",status="404"} 1' in exposition
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/drones/{drone_id}",le="0.005"} 1' in exposition
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/drones/{drone_id}",le="+Inf"} 2' in exposition
 
-    con = db_connect()
+    cache = CatalogCache(max_rows=2)
+    for drone_id in (1, 2, 3):
+        cache.put(("drone", drone_id), drone_id, weight=1, generation=cache.generation)
+    assert cache.get(("drone", 1)) is None and cache.get(("drone", 3)) == 3
+    stale_generation = cache.generation
+    cache.drone_changed(3)
+    cache.put(("drone", 3), 3, weight=1, generation=stale_generation)
+    assert cache.get(("drone", 3)) is None
+    cache.observe_version(7)
+    cache.put(("drone", 3), 3, weight=1, generation=cache.generation)
+    cache.observe_version(7)
+    assert cache.get(("drone", 3)) == 3
+    cache.observe_version(8)
+    assert cache.get(("drone", 3)) is None
+
+    async def overflow_and_resume() -> None:
+        # Polled by hand below, so the tailing task never runs.
+        hub = EventHub(max_queue=2, history=3, poll_seconds=3600)
+        await hub.start()
+        slow, _ = hub.subscribe(owner_channel(1))
+        first = await hub.publish([owner_channel(1)], "drone.updated", {"id": 1})
+        await hub.publish([farmer_channel("7100000000")], "booking.updated", {"id": 2})
+        for drone_id in (3, 4):
+            await hub.publish([owner_channel(1)], "drone.updated", {"id": drone_id})
+        # The third event for a full two-slot queue cuts the subscriber off.
+        assert slow.overflowed and slow.closed and hub.dropped == 1 and hub.subscribers == 0
+        _, replay = hub.subscribe(owner_channel(1), first)
+        assert [event.data for event in replay] == [b'{"id":3}', b'{"id":4}']
+        _, replay = hub.subscribe(owner_channel(1), "0")
+        assert [event.type for event in replay] == [RESET]
+
+        # Another worker's hub resumes the same ids and hears this one's events.
+        other = EventHub(max_queue=2, history=3, poll_seconds=3600)
+        await other.start()
+        _, replay = other.subscribe(owner_channel(1), first)
+        assert [event.data for event in replay] == [b'{"id":3}', b'{"id":4}']
+        farmer, _ = other.subscribe(farmer_channel("7100000000"))
+        await hub.publish([farmer_channel("7100000000")], "booking.updated", {"id": 5})
+        await other.poll()
+        assert (await farmer.next(1)).data == b'{"id":5}'
+        hub.close()
+        other.close()
+
+    asyncio.run(overflow_and_resume())
+
+    truncate_tables()
+    pool = get_pool()
+    con = pool.acquire()
     try:
-        truncate_tables()
+        assert con.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert current_version(con) == LATEST_VERSION
+        assert_indexed_plans(con)
         con.execute(
             "INSERT INTO owners(name,mobile,lat,lon) VALUES(?,?,?,?)",
             ("Owner", "7000000000", 25.6, 85.1),
@@ -63,7 +179,53 @@ def run_selftest() -> dict[str, str]:
         assert con.execute("SELECT COUNT(1) FROM drones").fetchone()[0] == 1
         assert con.execute("SELECT COUNT(1) FROM bookings").fetchone()[0] == 1
     finally:
-        con.close()
+        pool.release(con)
+
+    with pool.connection() as reused:
+        assert reused is con
+
+    async def count_owners() -> tuple[int, int]:
+        with tracked_queries() as stats:
+            count = await run_db(lambda db: db.execute("SELECT COUNT(1) FROM owners").fetchone()[0])
+        return count, stats.queries
+
+    count, queries = asyncio.run(count_owners())
+    assert count == 1
+    # Only the query itself; the pool's checkout health check is not counted.
+    assert queries == (1 if settings.db_trace else 0)
+
+    def rename_owner(db, name: str) -> str:
+        db.execute("UPDATE owners SET name=? WHERE mobile=?", (name, "7000000000"))
+        if name == "":
+            raise ValueError("empty name")
+        return name
+
+    async def grouped_writes() -> list:
+        return await asyncio.gather(
+            run_write(rename_owner, "Renamed"), run_write(rename_owner, ""), return_exceptions=True
+        )
+
+    renamed, failed = asyncio.run(grouped_writes())
+    # The failing write is rolled back alone; the other in its group commits.
+    assert renamed == "Renamed" and isinstance(failed, ValueError)
+    with pool.connection() as check:
+        assert check.execute("SELECT name FROM owners").fetchone()[0] == "Renamed"
+        fleetless_id = check.execute(
+            "INSERT INTO owners(name,mobile,lat,lon) VALUES(?,?,?,?)", ("Fleetless", "7000000001", 25.6, 85.1)
+        ).lastrowid
+        check.commit()
+
+    # Imported here, not at the top: scripts/check_startup.py fails if
+    # importing this module loads app.routers or FastAPI, which they import.
+    from .routers.owners import _seed_owner_demo_drones
+
+    async def first_visits() -> list[bool]:
+        return await asyncio.gather(*(run_write(_seed_owner_demo_drones, fleetless_id) for _ in range(2)))
+
+    # Two first visits at once: the writer re-checks, so the fleet is seeded once.
+    assert sorted(asyncio.run(first_visits())) == [False, True]
+    with pool.connection() as check:
+        assert check.execute("SELECT COUNT(1) FROM drones WHERE owner_id=?", (fleetless_id,)).fetchone()[0] == 3
 
     seed_demo_data()
 
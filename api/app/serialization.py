@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import datetime
+from itertools import repeat
+from typing import Any, Iterable, Mapping, Optional
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+from starlette.responses import Response
+
+from .models import api_timestamp
+
+
+class RowSerializer:
+    """Serialise trusted database rows straight to JSON bytes.
+
+    Rows come from our own schema with column names matching ``model``'s
+    fields, so the per-row model construction and the ``response_model``
+    re-validation FastAPI would otherwise run are skipped. Keys follow the
+    model's field order and missing optional fields take the model default.
+    Datetime fields hold SQLite text in whatever ISO form it was written in;
+    they are rewritten with :func:`api_timestamp`, as the models do.
+    """
+
+    def __init__(self, model: type[BaseModel]) -> None:
+        self.model = model
+        self._template: dict[str, Any] = {
+            name: None if field.is_required() else field.default
+            for name, field in model.model_fields.items()
+        }
+        self._timestamps = tuple(
+            name for name, field in model.model_fields.items() if field.annotation in (datetime, Optional[datetime])
+        )
+
+    def dump(self, rows: Iterable[Mapping[str, Any]], extras: Iterable[Mapping[str, Any]] | None = None) -> bytes:
+        template = self._template
+        timestamps = self._timestamps
+        items = []
+        for row, extra in zip(rows, extras if extras is not None else repeat(None)):
+            item = template.copy()
+            item.update(row)
+            if extra:
+                item.update(extra)
+            for name in timestamps:
+                if item[name] is not None:
+                    item[name] = api_timestamp(item[name])
+            items.append(item)
+        return to_json(items)
+
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
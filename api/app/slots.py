@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import calendar
+from datetime import datetime, timedelta, timezone
+
+from .migrations import SLOT_FORMAT
+
+
+def slot_time(value: datetime) -> datetime:
+    """``value`` as naive UTC truncated to the second, the precision slots are stored at."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=0)
+
+
+def _epoch_minute(value: datetime, round_up: bool = False) -> int:
+    seconds = calendar.timegm(value.timetuple())
+    return (seconds + 59) // 60 if round_up else seconds // 60
+
+
+def slot_bounds(starts: datetime, hours: int) -> tuple[str, str]:
+    """Stored ``(starts_at, ends_at)`` for a slot of ``hours`` beginning at ``starts``."""
+    starts = slot_time(starts)
+    return starts.strftime(SLOT_FORMAT), (starts + timedelta(hours=hours)).strftime(SLOT_FORMAT)
+
+
+def overlap_clause(drone: str, exclude: str | None = None) -> str:
+    """SQL that is true when drone ``drone`` holds a slot overlapping the window.
+
+    ``drone`` is a column or a ``?``; bind it twice followed by
+    :func:`overlap_params`. The R*Tree narrows candidates by minute and the
+    joined booking row settles the exact, half-open overlap; ``CROSS JOIN``
+    keeps the R*Tree as the outer loop, which ``ANALYZE`` statistics can
+    otherwise talk the planner out of. ``exclude``
+    (bound after the window) leaves one booking out, for rechecking a
+    booking's own slot.
+    """
+    return (
+        "EXISTS (SELECT 1 FROM booking_slots s CROSS JOIN bookings b ON b.id = s.id "
+        f"WHERE s.min_drone <= {drone} AND s.max_drone >= {drone} "
+        "AND s.min_minute < ? AND s.max_minute > ? AND b.starts_at < ? AND b.ends_at > ?"
+        + (f" AND s.id != {exclude})" if exclude else ")")
+    )
+
+
+def overlap_params(starts: datetime, ends: datetime) -> tuple:
+    """Parameters for :func:`overlap_clause`; both bounds must come from :func:`slot_time`."""
+    return (
+        _epoch_minute(ends, round_up=True),
+        _epoch_minute(starts),
+        ends.strftime(SLOT_FORMAT),
+        starts.strftime(SLOT_FORMAT),
+    )
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import gzip
+import os
+import re
+import shutil
+import tempfile
+from mimetypes import guess_type
+from pathlib import Path
+from typing import Any
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Uploads are stored as <sha256>.<ext> (see routers.assets); such a name can
+# never refer to different bytes, so clients may cache it forever.
+_CONTENT_ADDRESSED = re.compile(r"^([0-9a-f]{64})\.[a-z0-9]{1,8}$")
+# Formats that gzip shrinks; JPEG, PNG, WebP and friends are already compressed.
+COMPRESSIBLE_EXTENSIONS = frozenset({"svg", "bmp", "json", "txt", "csv", "xml", "html", "css", "js"})
+# Keep a .gz variant only when it saves at least this fraction of the bytes.
+MIN_GZIP_SAVING = 0.1
+
+
+class AssetFileResponse(FileResponse):
+    """``FileResponse`` with a caller-chosen ETag and sendfile where the server offers it.
+
+    Servers advertising the ASGI ``http.response.pathsend`` extension send the
+    file themselves (with ``sendfile`` where available); elsewhere the body is
+    read in larger chunks than Starlette's default. Byte ranges and
+    ``If-Range`` work against the ETag set here.
+    """
+
+    chunk_size = 256 * 1024
+    _pathsend = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self._pathsend = "http.response.pathsend" in scope.get("extensions", {})
+        await super().__call__(scope, receive, send)
+
+    async def _handle_simple(self, send: Send, send_header_only: bool) -> None:
+        if not self._pathsend or send_header_only:
+            await super()._handle_simple(send, send_header_only)
+            return
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+
+    def _should_use_range(self, http_if_range: str, stat_result: os.stat_result) -> bool:  # type: ignore[override]
+        return http_if_range == self.headers.get("etag") or http_if_range == self.headers.get("last-modified")
+
+
+class AssetFiles(StaticFiles):
+    """``StaticFiles`` that marks content-addressed uploads immutable and serves gzip variants.
+
+    For ``<sha256>.<ext>`` files the hash is the strong ETag. A ``.gz``
+    sibling, written once at upload time, is sent with
+    ``Content-Encoding: gzip`` to clients that accept it.
+    """
+
+    def file_response(
+        self,
+        full_path: Any,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        name = os.path.basename(full_path)
+        headers: dict[str, str] = {}
+        etag: str | None = None
+        match = _CONTENT_ADDRESSED.match(name)
+        if match:
+            headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+            etag = match[1]
+
+        path = os.fspath(full_path)
+        if name.rsplit(".", 1)[-1] in COMPRESSIBLE_EXTENSIONS:
+            headers["vary"] = "Accept-Encoding"
+            if accepts_gzip(request_headers.get("accept-encoding", "")):
+                try:
+                    # Called on the event loop like the rest of file_response;
+                    # one stat of a file whose directory was just looked up.
+                    gzip_stat = os.stat(f"{path}.gz")
+                except OSError:
+                    pass
+                else:
+                    path, stat_result = f"{path}.gz", gzip_stat
+                    headers["content-encoding"] = "gzip"
+                    etag = f"{etag}-gzip" if etag else None
+        if etag:
+            headers["etag"] = f'"{etag}"'
+
+        response = AssetFileResponse(
+            path,
+            status_code=status_code,
+            headers=headers,
+            media_type=guess_type(name)[0] or "application/octet-stream",
+            stat_result=stat_result,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip().removeprefix("q=")
+        try:
+            return not params or float(quality) > 0
+        except ValueError:
+            return False
+    return False
+
+
+def precompress(path: Path) -> bool:
+    """Write ``<path>.gz`` if gzip makes the file meaningfully smaller; True if written."""
+    if path.suffix.lstrip(".") not in COMPRESSIBLE_EXTENSIONS:
+        return False
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=".gzip-", delete=False) as tmp:
+        # mtime=0 keeps the output (and so its bytes on disk) reproducible.
+        with path.open("rb") as source, gzip.GzipFile(fileobj=tmp, mode="wb", compresslevel=9, mtime=0) as target:
+            shutil.copyfileobj(source, target, 256 * 1024)
+    if os.path.getsize(tmp.name) > path.stat().st_size * (1 - MIN_GZIP_SAVING):
+        os.unlink(tmp.name)
+        return False
+    os.chmod(tmp.name, 0o644)
+    os.replace(tmp.name, f"{path}.gz")
+    return True
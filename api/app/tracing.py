@@ -0,0 +1,168 @@
+"""Per-request SQL statement accounting and the slow-query log.
+
+Pooled connections are opened as :class:`TracedConnection`, whose cursors
+time every ``execute`` and ``fetch*`` call. Time is charged to the
+:class:`QueryStats` of the current request, found through a context
+variable that ``db.run_db`` carries onto the database threads. A statement
+whose execute-plus-fetch time crosses ``db_slow_query_ms`` is logged once,
+with its ``EXPLAIN QUERY PLAN``.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterable, Iterator
+
+from .metrics import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+QUERIES_HEADER = "X-DB-Queries"
+TIME_HEADER = "X-DB-Time"
+# Statements worth explaining; BEGIN, COMMIT and PRAGMAs have no useful plan.
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+class QueryStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.seconds = 0.0
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def tracked_queries() -> Iterator[QueryStats]:
+    """Charge statements run in this context, including ``run_db`` calls made from it, to a new QueryStats."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+class TracedCursor(sqlite3.Cursor):
+    _sql = ""
+    _params: Any = ()
+    _elapsed = 0.0
+    _logged = False
+
+    def execute(self, sql: str, parameters: Any = ()) -> TracedCursor:
+        self._sql, self._params, self._elapsed, self._logged = sql, parameters, 0.0, False
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._charge(time.perf_counter() - start, stats)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> TracedCursor:
+        # One batch counts as one statement and is never explained.
+        self._sql, self._params, self._elapsed, self._logged = sql, None, 0.0, False
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._charge(time.perf_counter() - start, stats)
+
+    def fetchone(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._charge(time.perf_counter() - start, _current.get())
+
+    def fetchmany(self, size: int | None = None) -> list[Any]:
+        start = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            self._charge(time.perf_counter() - start, _current.get())
+
+    def fetchall(self) -> list[Any]:
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._charge(time.perf_counter() - start, _current.get())
+
+    def _charge(self, seconds: float, stats: QueryStats | None) -> None:
+        if stats is not None:
+            stats.seconds += seconds
+        self._elapsed += seconds
+        if self._elapsed >= self.connection.slow_query_seconds and not self._logged:
+            self._logged = True
+            _log_slow(self.connection, self._sql, self._params, self._elapsed)
+
+
+class TracedConnection(sqlite3.Connection):
+    # Set by db.db_connect from DB_SLOW_QUERY_MS.
+    slow_query_seconds = float("inf")
+
+    def cursor(self, factory: type[sqlite3.Cursor] = TracedCursor) -> sqlite3.Cursor:  # type: ignore[override]
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:  # type: ignore[override]
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> sqlite3.Cursor:  # type: ignore[override]
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def _log_slow(con: sqlite3.Connection, sql: str, params: Any, seconds: float) -> None:
+    plan = ""
+    if params is not None and sql.lstrip().upper().startswith(_EXPLAINABLE):
+        try:
+            # A plain cursor, so explaining is neither traced nor counted.
+            rows = sqlite3.Cursor(con).execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            plan = "".join(f"\n  {row[3]}" for row in rows)
+        except sqlite3.Error as exc:
+            plan = f"\n  (no plan: {exc})"
+    logger.warning("Slow query (%.1f ms): %s%s", seconds * 1000, " ".join(sql.split()), plan)
+
+
+class QueryStatsMiddleware:
+    """Give each HTTP request its own :class:`QueryStats`.
+
+    With ``headers`` on, the totals so far are added to the response as
+    ``X-DB-Queries`` and ``X-DB-Time`` (milliseconds). Statements a streamed
+    body runs after the headers are sent are not in them.
+    """
+
+    def __init__(self, app: ASGIApp, headers: bool) -> None:
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with tracked_queries() as stats:
+            if not self.headers:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (QUERIES_HEADER.lower().encode(), str(stats.queries).encode()),
+                        (TIME_HEADER.lower().encode(), f"{stats.seconds * 1000:.3f}".encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
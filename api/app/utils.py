@@ -1,8 +1,16 @@
 import math
+from typing import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the pure-Python path is used instead
+    np = None
+
+EARTH_RADIUS_KM = 6371.0
 
 
 def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    r = 6371.0
+    r = EARTH_RADIUS_KM
     phi1 = math.radians(lat1)
     phi2 = math.radians(lat2)
     d_phi = math.radians(lat2 - lat1)
@@ -11,3 +19,63 @@ def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
     return r * c
 
+
+def haversine_km_batch(lat: float, lon: float, lats: Sequence[float], lons: Sequence[float]) -> list[float]:
+    """Distances in km from ``(lat, lon)`` to each ``(lats[i], lons[i])``.
+
+    Computed in one vectorised pass when NumPy is installed, otherwise with
+    the same formula as :func:`haversine_km` in a plain loop.
+    """
+    if not lats:
+        return []
+    if np is not None:
+        return _haversine_km_numpy(lat, lon, lats, lons).tolist()
+    return _haversine_km_python(lat, lon, lats, lons)
+
+
+def _haversine_km_numpy(lat: float, lon: float, lats: Sequence[float], lons: Sequence[float]):
+    phi1 = math.radians(lat)
+    phi2 = np.radians(np.asarray(lats, dtype=np.float64))
+    d_phi = phi2 - phi1
+    d_lambda = np.radians(np.asarray(lons, dtype=np.float64)) - math.radians(lon)
+    a = np.sin(d_phi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def _haversine_km_python(lat: float, lon: float, lats: Sequence[float], lons: Sequence[float]) -> list[float]:
+    phi1 = math.radians(lat)
+    cos_phi1 = math.cos(phi1)
+    lambda1 = math.radians(lon)
+    sin, cos, atan2, sqrt, radians = math.sin, math.cos, math.atan2, math.sqrt, math.radians
+    out = []
+    for lat2, lon2 in zip(lats, lons):
+        phi2 = radians(lat2)
+        a = sin((phi2 - phi1) / 2) ** 2 + cos_phi1 * cos(phi2) * sin((radians(lon2) - lambda1) / 2) ** 2
+        out.append(2 * EARTH_RADIUS_KM * atan2(sqrt(a), sqrt(1 - a)))
+    return out
+
+
+def bounding_box(lat: float, lon: float, dist_km: float) -> tuple[float, float, float, float]:
+    """Return ``(min_lat, max_lat, min_lon, max_lon)`` enclosing a ``dist_km`` radius.
+
+    The box is conservative: near the poles or across the antimeridian it
+    widens to the full longitude range rather than risk excluding a point.
+    The longitude half-width is the exact ``asin(sin(d/R) / cos(lat))``: the
+    circle's widest point lies poleward of ``lat``, so the flat-earth
+    ``(d/R) / cos(lat)`` falls short of it.
+    """
+    angular = dist_km / EARTH_RADIUS_KM
+    d_lat = math.degrees(angular)
+    min_lat = max(lat - d_lat, -90.0)
+    max_lat = min(lat + d_lat, 90.0)
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return min_lat, max_lat, -180.0, 180.0
+    ratio = math.sin(angular) / math.cos(math.radians(lat))
+    if ratio >= 1.0:
+        return min_lat, max_lat, -180.0, 180.0
+    d_lon = math.degrees(math.asin(ratio))
+    min_lon = lon - d_lon
+    max_lon = lon + d_lon
+    if min_lon < -180.0 or max_lon > 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, min_lon, max_lon
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+
+from fastapi import Request, Response, status
+
+
+def data_version(db: sqlite3.Connection, scope: str) -> int:
+    """Current version of ``scope``; a single primary-key lookup in ``data_versions``."""
+    row = db.execute("SELECT version FROM data_versions WHERE scope=?", (scope,)).fetchone()
+    return int(row[0]) if row else 0
+
+
+def make_etag(scope: str, version: int, variant: str = "") -> str:
+    """Strong ETag for ``scope`` at ``version``; ``variant`` separates query strings."""
+    digest = hashlib.blake2b(f"{scope}|{version}|{variant}".encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def set_etag(response: Response, etag: str, private: bool = False) -> None:
+    response.headers["ETag"] = etag
+    # Clients may keep the body but must revalidate before reusing it.
+    response.headers["Cache-Control"] = "private, no-cache" if private else "no-cache"
+    if private:
+        response.headers["Vary"] = "Authorization"
+
+
+def not_modified(etag: str, private: bool = False) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_etag(response, etag, private)
+    return response
@@ -1,13 +1,20 @@
 #!/usr/bin/env python3
 import argparse
+import importlib.util
 import json
 import logging
 import os
+import sys
+import tempfile
+from pathlib import Path
 
-import uvicorn
+# Keep module-level imports to the standard library: the app package, FastAPI
+# and uvicorn are imported only on the path that needs them, so ``--help`` and
+# ``--selftest`` start quickly (see scripts/check_startup.py).
 
-from app import app
-from app.selftest import run_selftest
+
+def _default_impl(module: str, preferred: str, fallback: str) -> str:
+    return preferred if importlib.util.find_spec(module) is not None else fallback
 
 
 def main() -> None:
@@ -18,19 +25,135 @@ def main() -> None:
 
     parser = argparse.ArgumentParser(description="Drone-as-a-Service FastAPI server")
     parser.add_argument("--selftest", action="store_true", help="Run internal diagnostics and exit")
+    parser.add_argument(
+        "--bench",
+        action="store_true",
+        help="Run the micro-benchmarks on a throwaway database; exit 1 if a stored threshold regresses",
+    )
+    parser.add_argument("--bench-repeat", type=int, default=7, help="Timed samples per benchmark case")
+    parser.add_argument(
+        "--bench-update",
+        action="store_true",
+        help="Rewrite app/bench_thresholds.json from this run instead of checking it",
+    )
     parser.add_argument("--host", default=os.environ.get("HOST", "127.0.0.1"))
     parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8080)))
+    parser.add_argument("--no-seed", action="store_true", help="Do not load demo fixtures on startup")
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="Run with APP_ENV=production (implies --no-seed)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("WEB_CONCURRENCY", 1)),
+        help="Worker processes; more than one runs under uvicorn's supervisor",
+    )
+    parser.add_argument(
+        "--loop",
+        choices=["uvloop", "asyncio"],
+        default=os.environ.get("UVICORN_LOOP", _default_impl("uvloop", "uvloop", "asyncio")),
+    )
+    parser.add_argument(
+        "--http",
+        choices=["httptools", "h11"],
+        default=os.environ.get("UVICORN_HTTP", _default_impl("httptools", "httptools", "h11")),
+    )
+    parser.add_argument(
+        "--backlog",
+        type=int,
+        default=int(os.environ.get("BACKLOG", 2048)),
+        help="Listen queue length for pending connections",
+    )
+    parser.add_argument(
+        "--keep-alive",
+        type=int,
+        default=int(os.environ.get("KEEP_ALIVE", 5)),
+        help="Seconds an idle keep-alive connection is held open",
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=int(os.environ.get("GRACEFUL_TIMEOUT", 30)),
+        help="Seconds a stopping worker waits for in-flight requests",
+    )
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=int(os.environ.get("MAX_REQUESTS", 0)),
+        help="Recycle a worker after this many requests (0 disables; needs --workers > 1)",
+    )
     args = parser.parse_args()
 
+    # Settings read the environment once, when app.config is first imported,
+    # so these must be set before anything from the app package is loaded.
+    if args.production:
+        os.environ["APP_ENV"] = "production"
+    if args.production or args.no_seed:
+        os.environ["SEED_DEMO"] = "0"
+
     if args.selftest:
+        from app.selftest import run_selftest
+
         result = run_selftest()
         print(json.dumps(result))
         return
 
+    if args.bench:
+        sys.exit(bench(args))
+
+    serve(args)
+
+
+def bench(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as workdir:
+        # The benchmark truncates and refills its database; never the configured one.
+        os.environ["DB_PATH"] = os.path.join(workdir, "bench.sqlite")
+        # The bulk fills are slow by design; keep them out of the slow-query log.
+        os.environ.setdefault("DB_SLOW_QUERY_MS", "0")
+        from app.bench import format_report, run_bench
+        from app.db import close_pool
+
+        try:
+            report = run_bench(repeat=args.bench_repeat, update_thresholds=args.bench_update)
+        finally:
+            close_pool()
+    print(format_report(report))
+    print(json.dumps({"bench": report["bench"], "regressions": report["regressions"]}))
+    return 1 if report["regressions"] else 0
+
+
+def serve(args: argparse.Namespace) -> None:
+    import uvicorn
+
+    from app.config import get_settings
+    from app.db import close_pool, prepare_database
+
+    # Migrate and seed once in this process so workers start against a ready
+    # database instead of racing to initialise it. The pool is closed again
+    # so no SQLite handle is inherited across the process boundary.
+    prepare_database(get_settings().seed_demo)
+    close_pool()
+    # Spawned workers read a fresh environment; they only need to migrate-check.
+    os.environ["SEED_DEMO"] = "0"
+
+    # Each worker imports the factory and builds its own app, pool and caches;
+    # nothing created here at import time is shared. SIGHUP restarts workers
+    # one at a time and dead workers are replaced by the supervisor.
     uvicorn.run(
-        app,
+        "app:create_app",
+        factory=True,
+        app_dir=str(Path(__file__).resolve().parent),
         host=args.host,
         port=args.port,
+        workers=args.workers,
+        loop=args.loop,
+        http=args.http,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        limit_max_requests=args.max_requests if args.max_requests > 0 and args.workers > 1 else None,
         reload=False,
         log_level="info",
     )
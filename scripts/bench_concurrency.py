@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Measure API latency under concurrent load against a throwaway server.
+
+Starts ``api/main.py`` on a temporary database, signs in one owner and one
+farmer, then keeps ``--concurrency`` requests in flight against endpoints that
+reach SQLite on every call (authenticated listings are never cached in process).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workdir: str) -> subprocess.Popen:
+    env = dict(os.environ, DB_PATH=os.path.join(workdir, "bench.sqlite"), LOG_LEVEL="WARNING")
+    env.setdefault("STATIC_ROOT", os.path.join(workdir, "static"))
+    env.setdefault("UPLOAD_DIR", os.path.join(workdir, "static", "uploads"))
+    return subprocess.Popen(
+        [sys.executable, str(ROOT_DIR / "api" / "main.py"), "--port", str(port)],
+        cwd=str(ROOT_DIR / "api"),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not become ready")
+
+
+async def sign_in(client: httpx.AsyncClient, mobile: str, role: str) -> dict[str, str]:
+    response = await client.post(
+        "/auth/verify_otp",
+        json={"mobile": mobile, "otp": "1357", "role": role, "name": f"Bench {role}", "lat": 25.6, "lon": 85.1},
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def run_load(client: httpx.AsyncClient, targets: list, total: int, concurrency: int) -> list[float]:
+    latencies: list[float] = []
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        for index in counter:
+            path, headers = targets[index % len(targets)]
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as workdir:
+        server = start_server(port, workdir)
+        try:
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+                await wait_ready(client)
+                owner = await sign_in(client, "7999000001", "owner")
+                farmer = await sign_in(client, "7999000002", "farmer")
+                targets = [
+                    ("/bookings/", owner),
+                    ("/bookings/", farmer),
+                    ("/owners/me/drones", owner),
+                    ("/drones/?lat=25.6&lon=85.1&max_dist_km=25", {}),
+                ]
+                await run_load(client, targets, args.requests // 10, args.concurrency)
+                start = time.perf_counter()
+                latencies = await run_load(client, targets, args.requests, args.concurrency)
+                elapsed = time.perf_counter() - start
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}: {args.requests / elapsed:8.1f} req/s")
+    print(
+        "latency ms  mean {:.2f}  p50 {:.2f}  p95 {:.2f}  p99 {:.2f}".format(
+            statistics.fmean(latencies) * 1000,
+            percentile(latencies, 50) * 1000,
+            percentile(latencies, 95) * 1000,
+            percentile(latencies, 99) * 1000,
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
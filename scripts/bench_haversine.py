@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Compare scalar and batch haversine for the filter-and-sort done by GET /drones."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR / "api"))
+
+from app import utils  # noqa: E402
+
+
+ORIGIN = (25.62, 85.14)
+RADIUS_KM = 5.0
+
+
+def make_points(count: int, seed: int = 7) -> tuple[List[float], List[float]]:
+    rng = random.Random(seed)
+    lats = [ORIGIN[0] + rng.uniform(-0.5, 0.5) for _ in range(count)]
+    lons = [ORIGIN[1] + rng.uniform(-0.5, 0.5) for _ in range(count)]
+    return lats, lons
+
+
+def scalar_twice(lats: List[float], lons: List[float]) -> list[int]:
+    # Mirrors the previous list_drones: one call to filter, another as the sort key.
+    lat, lon = ORIGIN
+    kept = [i for i in range(len(lats)) if utils.haversine_km(lat, lon, lats[i], lons[i]) <= RADIUS_KM]
+    kept.sort(key=lambda i: utils.haversine_km(lat, lon, lats[i], lons[i]))
+    return kept
+
+
+def batch_once(lats: List[float], lons: List[float]) -> list[int]:
+    distances = utils.haversine_km_batch(ORIGIN[0], ORIGIN[1], lats, lons)
+    kept = [i for i, dist in enumerate(distances) if dist <= RADIUS_KM]
+    kept.sort(key=distances.__getitem__)
+    return kept
+
+
+def batch_python(lats: List[float], lons: List[float]) -> list[int]:
+    numpy_module = utils.np
+    utils.np = None
+    try:
+        return batch_once(lats, lons)
+    finally:
+        utils.np = numpy_module
+
+
+def best_of(fn: Callable[[List[float], List[float]], list[int]], lats, lons, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(lats, lons)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    variants = [("scalar x2", scalar_twice), ("batch python", batch_python)]
+    if utils.np is not None:
+        variants.append(("batch numpy", batch_once))
+    else:
+        print("numpy not installed; only the pure-Python batch path is measured")
+
+    for size in args.sizes:
+        lats, lons = make_points(size)
+        assert scalar_twice(lats, lons) == batch_once(lats, lons)
+        baseline = None
+        for name, fn in variants:
+            elapsed = best_of(fn, lats, lons, args.repeat)
+            baseline = baseline or elapsed
+            print(f"{size:>8} drones  {name:<13} {elapsed * 1000:9.2f} ms  x{baseline / elapsed:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Compare list-response serialisation: per-row models + response_model vs RowSerializer."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR / "api"))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.models import BookingOut, DroneOut  # noqa: E402
+from app.serialization import RowSerializer  # noqa: E402
+
+
+def make_db(count: int) -> sqlite3.Connection:
+    con = sqlite3.connect(":memory:")
+    con.row_factory = sqlite3.Row
+    con.execute(
+        "CREATE TABLE drones (id INTEGER PRIMARY KEY, name TEXT, type TEXT, lat REAL, lon REAL, status TEXT, "
+        "price_per_hr REAL, image_url TEXT, battery_mah REAL, capacity_liters REAL, owner_id INTEGER)"
+    )
+    con.execute(
+        "CREATE TABLE bookings (id INTEGER PRIMARY KEY, drone_id INTEGER, farmer_name TEXT, farmer_mobile TEXT, "
+        "booking_date TEXT, duration_hrs INTEGER, status TEXT)"
+    )
+    con.executemany(
+        "INSERT INTO drones VALUES(?,?,?,?,?,?,?,?,?,?,?)",
+        (
+            (i, f"Drone {i}", "Spray", 25.6 + i * 1e-5, 85.1 + i * 1e-5, "Available", 500.0 + i,
+             f"https://example.com/{i}.jpg", 9000.0, 30.0, i % 50 + 1)
+            for i in range(1, count + 1)
+        ),
+    )
+    con.executemany(
+        "INSERT INTO bookings VALUES(?,?,?,?,?,?,?)",
+        (
+            (i, i, f"Farmer {i}", "7100000000", f"2025-10-{i % 28 + 1:02d}T09:30:00Z", 2, "Pending")
+            for i in range(1, count + 1)
+        ),
+    )
+    return con
+
+
+def response_model_path(model, rows, extras) -> bytes:
+    # What the handlers did before: build a model per row, then FastAPI
+    # re-validates against response_model, dumps to JSON-able data and json.dumps it.
+    adapter = TypeAdapter(List[model])
+    items = [model(**dict(row), **extra) for row, extra in zip(rows, extras)]
+    validated = adapter.validate_python(items, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def best_of(fn: Callable[[], bytes], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    serializers = {DroneOut: RowSerializer(DroneOut), BookingOut: RowSerializer(BookingOut)}
+    for size in args.sizes:
+        con = make_db(size)
+        cases = (
+            (DroneOut, con.execute("SELECT * FROM drones").fetchall(), {"image_urls": None}),
+            (BookingOut, con.execute("SELECT * FROM bookings").fetchall(), {}),
+        )
+        for model, rows, extra in cases:
+            extras = [extra] * len(rows)
+            fast = serializers[model]
+            assert json.loads(fast.dump(rows, extras)) == json.loads(response_model_path(model, rows, extras))
+            before = best_of(lambda: response_model_path(model, rows, extras), args.repeat)
+            after = best_of(lambda: fast.dump(rows, extras), args.repeat)
+            print(
+                f"{size:>7} rows  {model.__name__:<10} response_model {before * 1000:8.2f} ms"
+                f"  RowSerializer {after * 1000:8.2f} ms  x{before / after:5.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
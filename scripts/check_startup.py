@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Fail when cold-start imports exceed their budget, using ``python -X importtime``.
+
+Each case runs in a fresh interpreter from ``api/``; modules a bare
+``python -c pass`` already imports (``site`` and its ``.pth`` hooks) are not
+counted. Besides the time budget, the cheap paths must not pull in the web
+stack at all.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+API_DIR = ROOT_DIR / "api"
+
+# (name, interpreter arguments, budget in ms, modules that must not be imported)
+CASES = (
+    ("import app", ["-c", "import app"], 10.0, ("fastapi", "uvicorn", "sqlite3")),
+    ("main.py --help", ["main.py", "--help"], 40.0, ("fastapi", "uvicorn", "app")),
+    ("import app.selftest", ["-c", "import app.selftest"], 600.0, ("fastapi", "uvicorn", "app.routers")),
+)
+
+
+def measure(argv: list[str]) -> dict[str, tuple[int, int]]:
+    """Return ``{module: (self_us, cumulative_us)}`` for one cold interpreter run."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        cwd=str(API_DIR),
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    modules: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules[name] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow CI hosts)")
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports to list per case")
+    args = parser.parse_args()
+
+    baseline = measure(["-c", "pass"]).keys()
+    failed = False
+    for name, argv, budget_ms, forbidden in CASES:
+        # Best of three so a cold page cache on the first run does not fail the check.
+        runs = [
+            {module: times for module, times in measure(argv).items() if module not in baseline}
+            for _ in range(3)
+        ]
+        modules = min(runs, key=lambda mods: sum(self_us for self_us, _ in mods.values()))
+        total_ms = sum(self_us for self_us, _ in modules.values()) / 1000
+        leaked = sorted(mod for mod in forbidden if mod in modules)
+        ok = total_ms <= budget_ms * args.scale and not leaked
+        failed |= not ok
+        print(f"[{'ok' if ok else 'FAIL'}] {name}: {total_ms:.1f} ms (budget {budget_ms * args.scale:.0f} ms)")
+        if leaked:
+            print(f"    imported {', '.join(leaked)}")
+        slowest = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)[: args.top]
+        for module, (_, cumulative_us) in slowest:
+            print(f"    {cumulative_us / 1000:8.1f} ms  {module}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,36 @@
 #!/usr/bin/env python3
-"""End-to-end check of the drone API using the built-in HTTP server."""
+"""End-to-end check of the drone API, plus a concurrent load generator.
+
+Without arguments the OTP -> drone -> booking flow runs once, sequentially.
+``--load`` instead simulates many farmers and owners concurrently (asyncio,
+pooled keep-alive connections) with a weighted mix of browse, book and accept
+operations, reports throughput, p50/p95/p99 latency and error rate per
+endpoint, and can save the results as JSON and diff them against a baseline.
+"""
 
 from __future__ import annotations
 
+import argparse
+import asyncio
 import json
 import os
+import random
 import subprocess
 import sys
+import tempfile
 import time
 import urllib.error
 import urllib.request
+from collections import defaultdict
 from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    # Only --load uses httpx (see api/requirements-dev.txt); the demo flow runs on the stdlib.
+    import httpx
 
 HOST = os.environ.get("HOST", "127.0.0.1")
 PORT = int(os.environ.get("PORT", 8090))
@@ -49,9 +67,9 @@ def http_json(
 
 
 @contextmanager
-def run_server(env: Dict[str, str]):
+def run_server(env: Dict[str, str], server_args: Sequence[str] = ()):
     proc = subprocess.Popen(
-        [sys.executable, str(API_ENTRY)],
+        [sys.executable, str(API_ENTRY), *server_args],
         stdout=subprocess.DEVNULL,
         stderr=subprocess.DEVNULL,
         env=env,
@@ -78,7 +96,7 @@ def run_server(env: Dict[str, str]):
             proc.kill()
 
 
-def main() -> None:
+def run_demo() -> None:
     env = os.environ.copy()
     env.setdefault("TZ", "UTC")
     env.setdefault("HOST", HOST)
@@ -186,6 +204,336 @@ def main() -> None:
     print(json.dumps(results, indent=2))
 
 
+# Load generation ------------------------------------------------------------
+
+DEFAULT_MIX = "browse=70,book=20,accept=10"
+DRONE_TYPES = ("Spray", "Survey", "Mapping", "Surveillance")
+# Demo fixtures and new owners' starter fleets sit around Patna.
+BROWSE_ORIGIN = (25.62, 85.14)
+# Booked slots start on the hour within a year of this run.
+SLOT_EPOCH = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+@dataclass
+class LoadStats:
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def record(self, endpoint: str, elapsed: float, ok: bool) -> None:
+        self.latencies[endpoint].append(elapsed)
+        if not ok:
+            self.errors[endpoint] += 1
+
+
+@dataclass
+class Fleet:
+    owners: List[Dict[str, str]]
+    farmers: List[Dict[str, str]]
+    drone_ids: List[int]
+
+
+async def timed_request(
+    client: httpx.AsyncClient,
+    stats: LoadStats,
+    endpoint: str,
+    method: str,
+    path: str,
+    expected: Tuple[int, ...] = (),
+    **kwargs: Any,
+) -> httpx.Response | None:
+    """Send one request and record it under ``endpoint`` (method + route template).
+
+    Statuses in ``expected`` count as successes even when they are 4xx.
+    """
+    import httpx
+
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, path, **kwargs)
+    except httpx.HTTPError:
+        stats.record(endpoint, time.perf_counter() - start, ok=False)
+        return None
+    stats.record(endpoint, time.perf_counter() - start, ok=response.status_code < 400 or response.status_code in expected)
+    return response
+
+
+async def browse(client: httpx.AsyncClient, stats: LoadStats, fleet: Fleet, rng: random.Random) -> None:
+    lat, lon = BROWSE_ORIGIN
+    params: Dict[str, Any] = rng.choice(
+        (
+            {"lat": lat, "lon": lon, "max_dist_km": rng.choice((5, 10, 25)), "sort_by": "distance", "limit": 20},
+            {"type": rng.choice(DRONE_TYPES), "sort_by": "price", "limit": 20},
+            {"status": "Available", "limit": 50},
+            {"min_price": rng.choice((500, 5000)), "max_price": 15000, "sort_by": "price", "limit": 20},
+        )
+    )
+    response = await timed_request(client, stats, "GET /drones/", "GET", "/drones/", params=params)
+    drones = response.json() if response is not None and response.status_code == 200 else []
+    drone_id = rng.choice(drones)["id"] if drones else rng.choice(fleet.drone_ids)
+    await timed_request(client, stats, "GET /drones/{id}", "GET", f"/drones/{drone_id}")
+
+
+async def book(client: httpx.AsyncClient, stats: LoadStats, fleet: Fleet, rng: random.Random) -> None:
+    headers = rng.choice(fleet.farmers)
+    await timed_request(
+        client,
+        stats,
+        "POST /bookings/",
+        "POST",
+        "/bookings/",
+        # Slots on the hour over the next year; a 409 for an overlapping slot is a valid answer.
+        expected=(409,),
+        json={
+            "drone_id": rng.choice(fleet.drone_ids),
+            "duration_hrs": rng.randint(1, 6),
+            "starts_at": (SLOT_EPOCH + timedelta(hours=rng.randrange(24 * 365))).isoformat(),
+        },
+        headers=headers,
+    )
+    await timed_request(client, stats, "GET /bookings/", "GET", "/bookings/", params={"limit": 20}, headers=headers)
+
+
+async def accept(client: httpx.AsyncClient, stats: LoadStats, fleet: Fleet, rng: random.Random) -> None:
+    headers = rng.choice(fleet.owners)
+    response = await timed_request(
+        client, stats, "GET /bookings/", "GET", "/bookings/", params={"status": "Pending", "limit": 20}, headers=headers
+    )
+    pending = response.json() if response is not None and response.status_code == 200 else []
+    if pending:
+        await timed_request(
+            client,
+            stats,
+            "PATCH /bookings/{id}",
+            "PATCH",
+            f"/bookings/{rng.choice(pending)['id']}",
+            # Another owner session may have rejected it meanwhile, and its slot since been retaken.
+            expected=(409,),
+            json={"status": rng.choice(("Accepted", "Rejected"))},
+            headers=headers,
+        )
+
+
+OPERATIONS = {"browse": browse, "book": book, "accept": accept}
+
+
+def parse_mix(mix: str) -> Tuple[List[str], List[float]]:
+    names: List[str] = []
+    weights: List[float] = []
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise ValueError(f"unknown operation {name!r}; expected one of {', '.join(OPERATIONS)}")
+        names.append(name.strip())
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+async def provision(client: httpx.AsyncClient, owners: int, farmers: int) -> Fleet:
+    """Sign in simulated users; each new owner's first fleet listing seeds its starter drones."""
+    # Mobiles are unique per run so repeated runs against one server do not collide.
+    run_tag = int(time.time()) % 10_000
+
+    async def sign_in(role: str, prefix: str, index: int) -> Dict[str, str]:
+        response = await client.post(
+            "/auth/verify_otp",
+            json={
+                "mobile": f"{prefix}{run_tag:04d}{index:05d}",
+                "otp": os.environ.get("OTP_CODE", "1357"),
+                "role": role,
+                "name": f"Load {role} {index}",
+                "lat": BROWSE_ORIGIN[0],
+                "lon": BROWSE_ORIGIN[1],
+            },
+        )
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    owner_headers = list(await asyncio.gather(*(sign_in("owner", "6", i) for i in range(owners))))
+    farmer_headers = list(await asyncio.gather(*(sign_in("farmer", "8", i) for i in range(farmers))))
+    fleets = await asyncio.gather(*(client.get("/owners/me/drones", headers=headers) for headers in owner_headers))
+    drone_ids = [drone["id"] for response in fleets for drone in response.json()]
+    if not drone_ids:
+        raise RuntimeError("simulated owners have no drones to book")
+    return Fleet(owners=owner_headers, farmers=farmer_headers, drone_ids=drone_ids)
+
+
+async def drive(
+    client: httpx.AsyncClient, fleet: Fleet, args: argparse.Namespace, duration: float, stats: LoadStats
+) -> float:
+    names, weights = parse_mix(args.mix)
+    deadline = time.perf_counter() + duration
+
+    async def user(index: int) -> None:
+        rng = random.Random(args.seed + index)
+        while time.perf_counter() < deadline:
+            operation = OPERATIONS[rng.choices(names, weights)[0]]
+            await operation(client, stats, fleet, rng)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(index) for index in range(args.concurrency)))
+    return time.perf_counter() - started
+
+
+def percentile(ordered: Sequence[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(latencies: Sequence[float], errors: int, elapsed: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "error_rate": round(errors / len(ordered), 6),
+        "rps": round(len(ordered) / elapsed, 2),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+    }
+
+
+async def run_load_async(args: argparse.Namespace, base_url: str) -> Dict[str, Any]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        fleet = await provision(client, args.owners, args.farmers)
+        if args.warmup > 0:
+            await drive(client, fleet, args, args.warmup, LoadStats())
+        stats = LoadStats()
+        elapsed = await drive(client, fleet, args, args.duration, stats)
+
+    all_latencies = [value for values in stats.latencies.values() for value in values]
+    return {
+        "config": {
+            "base_url": base_url,
+            "mix": args.mix,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "owners": args.owners,
+            "farmers": args.farmers,
+            "workers": args.workers,
+            "commit": git_commit(),
+        },
+        "elapsed_s": round(elapsed, 3),
+        "total": summarize(all_latencies, sum(stats.errors.values()), elapsed),
+        "endpoints": {
+            endpoint: summarize(values, stats.errors[endpoint], elapsed)
+            for endpoint, values in sorted(stats.latencies.items())
+        },
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    print(f"{'endpoint':<22} {'requests':>9} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    rows = list(results["endpoints"].items()) + [("total", results["total"])]
+    for endpoint, row in rows:
+        print(
+            f"{endpoint:<22} {row['requests']:>9} {row['rps']:>9.1f} {row['p50_ms']:>9.2f} "
+            f"{row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['error_rate']:>7.2%}"
+        )
+
+
+def diff_against(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float | None) -> bool:
+    """Print changes relative to ``baseline``; False if any p95 regressed past ``max_regression`` %."""
+    ok = True
+    print(f"\nvs baseline ({baseline.get('config', {}).get('commit') or 'unknown commit'}):")
+    print(f"{'endpoint':<22} {'rps':>16} {'p50 ms':>18} {'p95 ms':>18} {'p99 ms':>18}")
+    current = dict(results["endpoints"], total=results["total"])
+    previous = dict(baseline.get("endpoints", {}), total=baseline.get("total", {}))
+    for endpoint, row in current.items():
+        before = previous.get(endpoint)
+        if not before:
+            print(f"{endpoint:<22} (new)")
+            continue
+        cells = []
+        for metric in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            change = (row[metric] - before[metric]) / before[metric] * 100 if before[metric] else 0.0
+            cells.append(f"{row[metric]:>9.1f} {change:>+6.1f}%")
+        print(f"{endpoint:<22} " + " ".join(f"{cell:>18}" for cell in cells))
+        if max_regression is not None and before["p95_ms"]:
+            if (row["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 > max_regression:
+                print(f"  p95 regression on {endpoint} exceeds {max_regression:.0f}%")
+                ok = False
+    return ok
+
+
+def run_load(args: argparse.Namespace) -> int:
+    if args.base_url:
+        results = asyncio.run(run_load_async(args, args.base_url.rstrip("/")))
+    else:
+        env = os.environ.copy()
+        env.setdefault("TZ", "UTC")
+        env.update(HOST=HOST, PORT=str(PORT), LOG_LEVEL="WARNING")
+        server_args = ["--workers", str(args.workers)]
+        if args.db:
+            env["DB_PATH"] = str(Path(args.db).resolve())
+            server_args.append("--no-seed")
+        with tempfile.TemporaryDirectory() as workdir:
+            env.setdefault("DB_PATH", os.path.join(workdir, "load.sqlite"))
+            env.setdefault("STATIC_ROOT", os.path.join(workdir, "static"))
+            env.setdefault("UPLOAD_DIR", os.path.join(workdir, "static", "uploads"))
+            with run_server(env, server_args):
+                results = asyncio.run(run_load_async(args, BASE_URL))
+
+    print_report(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nresults written to {args.output}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if not diff_against(results, baseline, args.max_regression):
+            return 1
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--load", action="store_true", help="Run the concurrent load generator instead of the demo flow")
+    parser.add_argument("--base-url", help="Target a running server instead of starting one")
+    parser.add_argument("--db", help="Serve this database (e.g. from generate_dataset.py) without demo seeding")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for the spawned server")
+    parser.add_argument("--concurrency", type=int, default=32, help="Simulated users issuing requests at once")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before the run")
+    parser.add_argument("--owners", type=int, default=20)
+    parser.add_argument("--farmers", type=int, default=100)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted operations, e.g. browse=70,book=20,accept=10")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare with a previously saved results file")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        help="With --baseline, exit 1 if any endpoint's p95 grew by more than this percentage",
+    )
+    args = parser.parse_args()
+
+    if not args.load:
+        run_demo()
+        return
+    try:
+        parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+    try:
+        import httpx  # noqa: F401  # fail here, before a server is started
+    except ImportError:
+        parser.error("--load needs httpx: pip install -r api/requirements-dev.txt")
+    sys.exit(run_load(args))
+
+
 if __name__ == "__main__":
     try:
         main()
@@ -12,6 +12,9 @@ export TZ="UTC"
 export HOST="${HOST:-127.0.0.1}"
 export PORT="${PORT:-8080}"
 
+echo "[run_checks] Checking startup import budget" >&2
+python "${ROOT_DIR}/scripts/check_startup.py"
+
 echo "[run_checks] Running API selftest" >&2
 python "${ROOT_DIR}/api/main.py" --selftest
 